@@ -5,79 +5,371 @@ Extracts meat products and prices from Mad Butcher Dunedin
 """
 
 import asyncio
-import pandas as pd
 import logging
 import argparse
+import csv
+import json
+import os
 import re
 import random
 from datetime import datetime
-from typing import List, Dict
-from playwright.async_api import async_playwright
+from functools import lru_cache
+from typing import List, Dict, Iterator, Optional, Tuple
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from scraper_common import block_unneeded_requests
+
+try:
+    # Optional fast path: fetch server-rendered pages without a browser
+    import httpx
+    from selectolax.parser import HTMLParser
+except ImportError:
+    httpx = None
+    HTMLParser = None
+
+try:
+    import h2  # noqa: F401 - lets httpx speak HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    import uvloop  # Faster drop-in event loop where available
+except ImportError:
+    uvloop = None
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# Mad Butcher uses WooCommerce structure
+PRODUCT_SELECTOR = '.product, .type-product, li.product-type-simple'
+
+COLUMN_ORDER = ['store', 'sku', 'name', 'brand', 'sale_price', 'original_price', 'price_per_kg', 'unit_type', 'saving', 'scraped_at']
+
+# Compiled once at import instead of per card
+_PRICE_CLEAN_RE = re.compile(r'[^\d.]')
+_POST_ID_RE = re.compile(r'post-(\d+)')
+# A $X.XX amount or a "kg" marker (which also covers "/kg"), case-insensitive.
+# The two alternatives can't overlap, so one left-to-right pass finds both.
+_PRICE_OR_KG_RE = re.compile(r'\$\s*(?P<dollars>\d+)\.(?P<cents>\d{2})|(?P<kg>kg)', re.IGNORECASE)
+
+# Common non-product text that shows up in card titles/links
+INVALID_NAME_PHRASES = (
+    'christmas hours',
+    'opening hours',
+    'holiday hours',
+    'specials!',
+    'specials',
+    'closed',
+    'contact us',
+    'add to cart',
+    'select options',
+    'view details',
+    'shop now',
+)
+# One case-insensitive scan over the text matches every phrase - no lowered copy
+_INVALID_NAME_RE = re.compile('|'.join(map(re.escape, INVALID_NAME_PHRASES)), re.IGNORECASE)
+
+# Woo pagination widget: "1 2 3 … 7 →" - the largest number is the last page
+PAGINATION_SELECTOR = '.woocommerce-pagination .page-numbers'
+
+# Card field -> selector; each field takes the first match in document order
+CARD_FIELD_SELECTORS = {
+    'title': '.woocommerce-loop-product__title, h2, h3, .product-title',
+    'link': 'a.woocommerce-LoopProduct-link, a[href*="product"]',
+    'sale': '.price ins .woocommerce-Price-amount, .price .amount, bdi',
+    'regular': '.price, .woocommerce-Price-amount, bdi',
+    'was': '.price del .woocommerce-Price-amount, del bdi',
+}
+
+# Pulls every field we need out of every card in a single browser round-trip.
+# The field selectors are joined into one query so each card is walked once;
+# matched elements are then dispatched to their field(s) with el.matches().
+# Selectors are baked in as consts at import, so every page gets byte-identical
+# source and the browser parses each selector string once per document.
+EXTRACT_CARDS_JS = """
+() => {
+    const CARD_SELECTOR = %(card_selector)s;
+    const FIELDS = Object.entries(%(fields)s);
+    const COMBINED = [...FIELDS.map(([, sel]) => sel), 'a'].join(', ');
+    return Array.from(document.querySelectorAll(CARD_SELECTOR), card => {
+        const out = {
+            text: card.innerText,
+            anchors: [],
+            attrs: Object.fromEntries(Array.from(card.attributes, a => [a.name, a.value])),
+        };
+        for (const [name] of FIELDS) out[name] = null;
+        for (const el of card.querySelectorAll(COMBINED)) {
+            for (const [name, sel] of FIELDS) {
+                if (out[name] === null && el.matches(sel)) out[name] = el.innerText;
+            }
+            if (el.localName === 'a') out.anchors.push(el.innerText);
+        }
+        return out;
+    });
+}
+""" % {'card_selector': json.dumps(PRODUCT_SELECTOR), 'fields': json.dumps(CARD_FIELD_SELECTORS)}
+
+PAGINATION_LABELS_JS = "() => Array.from(document.querySelectorAll(%s), el => el.innerText)" % json.dumps(PAGINATION_SELECTOR)
+
+# Installed once per context with add_init_script, so each page only has to
+# send the tiny call expressions below instead of the full extractor source.
+EXTRACTOR_INIT_JS = "window.__extractCards = %s;\nwindow.__paginationLabels = %s;" % (
+    EXTRACT_CARDS_JS.strip(), PAGINATION_LABELS_JS,
+)
+EXTRACT_CARDS_CALL = '__extractCards()'
+PAGINATION_LABELS_CALL = '__paginationLabels()'
+
+
+@lru_cache(maxsize=4096)
+def is_valid_product_name(text: str) -> bool:
+    """Filter out non-product text (cached - cards repeat "Add to cart" etc.)"""
+    if not text or len(text.strip()) < 5:  # Increased from 3 to 5
+        return False
+    
+    # Filter out common non-product text
+    if _INVALID_NAME_RE.search(text):
+        return False
+    
+    # Must not start with $
+    if text.startswith('$'):
+        return False
+    
+    # Filter out very short names that end with !
+    if len(text) < 12 and text.endswith('!'):
+        return False
+    
+    return True
+
+
+def _node_text(node) -> str:
+    """Rough innerText equivalent for a selectolax node"""
+    return node.text(separator='\n', strip=True)
+
+
+def parse_listing_html(html):
+    """
+    selectolax tree for a listing page. Accepts raw bytes - selectolax
+    (Modest, in C) sniffs the encoding itself.
+    """
+    
+    tree = HTMLParser(html)
+    # innerText never includes these; dropping them once keeps node text close
+    # to what the browser path sees and shrinks every later CSS query
+    tree.strip_tags(['script', 'style', 'noscript'])
+    return tree
+
+
+def last_page_number(labels) -> Optional[int]:
+    """Highest page number among pagination labels, None if there's no widget"""
+    numbers = [int(label) for label in (l.strip() for l in labels) if label.isdigit()]
+    return max(numbers) if numbers else None
+
+
+def extract_cards_from_tree(tree) -> List[Dict]:
+    """Same card dicts as EXTRACT_CARDS_JS, built from server-rendered HTML"""
+    
+    cards = []
+    
+    for card in tree.css(PRODUCT_SELECTOR):
+        out = {
+            'text': _node_text(card),
+            'anchors': [_node_text(a) for a in card.css('a')],
+            'attrs': dict(card.attributes),
+        }
+        for name, selector in CARD_FIELD_SELECTORS.items():
+            node = card.css_first(selector)
+            out[name] = _node_text(node) if node is not None else None
+        cards.append(out)
+    
+    return cards
+
+
+def scan_price_and_unit(text: str) -> Tuple[Optional[float], bool]:
+    """First $X.XX amount in the text and whether it mentions kg - one scan, stops once both are known"""
+    
+    first_price = None
+    sold_by_kg = False
+    
+    for match in _PRICE_OR_KG_RE.finditer(text):
+        if match.group('kg'):
+            sold_by_kg = True
+        elif first_price is None:
+            first_price = float(f"{match.group('dollars')}.{match.group('cents')}")
+        
+        if sold_by_kg and first_price is not None:
+            break
+    
+    return first_price, sold_by_kg
+
+
+class RunningStats:
+    """Summary stats updated product by product, so nothing has to be kept around for them"""
+    
+    def __init__(self):
+        self.count = 0
+        self.min_price = None
+        self.max_price = None
+        self.mean_price = 0.0
+        self.on_sale = 0
+        self.mean_saving = 0.0
+    
+    def add(self, product: Dict):
+        price = product['sale_price']
+        self.count += 1
+        self.min_price = price if self.min_price is None else min(self.min_price, price)
+        self.max_price = price if self.max_price is None else max(self.max_price, price)
+        # Incremental (Welford) mean - no running total to drift
+        self.mean_price += (price - self.mean_price) / self.count
+        
+        saving = product['saving']
+        if saving > 0:
+            self.on_sale += 1
+            self.mean_saving += (saving - self.mean_saving) / self.on_sale
+    
+    def log(self):
+        if self.count == 0:
+            return
+        logger.info(f"📊 Stats:")
+        logger.info(f"   Total products: {self.count}")
+        logger.info(f"   Price range: ${self.min_price:.2f} - ${self.max_price:.2f}")
+        logger.info(f"   Avg price: ${self.mean_price:.2f}")
+        if self.on_sale > 0:
+            logger.info(f"   On sale: {self.on_sale} products")
+            logger.info(f"   Avg saving: ${self.mean_saving:.2f}")
+
+
+class BrowserPool:
+    """
+    One warm Chromium per process, shared by every scrape that runs in it.
+    Callers get a fresh (cheap) context each time and close only that -
+    the browser stays up until BrowserPool.close().
+    
+    Playwright objects belong to the event loop that created them, so the
+    pool is reused within one asyncio.run(); close it before that returns.
+    """
+    
+    _playwright = None
+    _browser = None
+    _lock = None
+    
+    @classmethod
+    async def get(cls, headless=True):
+        """Return the shared browser, launching it on first use"""
+        
+        if cls._lock is None:
+            cls._lock = asyncio.Lock()
+        
+        async with cls._lock:
+            if cls._browser is None or not cls._browser.is_connected():
+                if cls._playwright is None:
+                    cls._playwright = await async_playwright().start()
+                cls._browser = await cls._playwright.chromium.launch(
+                    headless=headless,
+                    args=[
+                        '--disable-blink-features=AutomationControlled',
+                        '--disable-dev-shm-usage',
+                    ]
+                )
+        
+        return cls._browser
+    
+    @classmethod
+    async def acquire_context(cls, headless=True, **context_options):
+        """New isolated context on the shared browser"""
+        browser = await cls.get(headless)
+        return await browser.new_context(**context_options)
+    
+    @classmethod
+    async def close(cls):
+        """Shut down the shared browser and Playwright driver"""
+        
+        if cls._browser is not None:
+            await cls._browser.close()
+        if cls._playwright is not None:
+            await cls._playwright.stop()
+        
+        cls._browser = None
+        cls._playwright = None
+        cls._lock = None
+
+
 class MadButcherScraper:
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, max_concurrency=5):
         self.base_url = "https://madbutcher.co.nz/dunedin/"
         self.headless = headless
+        self.max_concurrency = max_concurrency
+        self.max_pages = 20
         self.products = []
-        
+        # Learned from page 1's pagination widget, if it has one
+        self.last_page = None
+        self.stats = RunningStats()
+        # Set while scrape_all is streaming to a CSV
+        self.writer = None
+        
+    def default_filename(self) -> str:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return f'madbutcher_products_{timestamp}.csv'
+    
+    def page_url(self, page_num: int) -> str:
+        """Listing URL for a page number"""
+        return f"{self.base_url}?product-page={page_num}"
+    
     async def scrape_page(self, page, page_num: int) -> List[Dict]:
-        """Scrape products from a single page"""
-        
-        products = []
+        """Pull the raw product cards off a single page"""
         
         try:
-            # Wait for products to load
-            await asyncio.sleep(3)
-            
-            # Mad Butcher uses WooCommerce structure
-            product_cards = await page.query_selector_all('.product, .type-product, li.product-type-simple')
-            
-            if not product_cards:
-                logger.warning(f"  No products found on page {page_num}")
-                return []
-            
-            logger.info(f"  Page {page_num}: Found {len(product_cards)} product cards")
-            
-            for i, card in enumerate(product_cards):
-                try:
-                    product = await self.parse_product_card(card)
-                    if product and product.get('name'):
-                        products.append(product)
-                        if i < 5:  # Debug first 5
-                            on_sale = " [SALE]" if product.get('saving', 0) > 0 else ""
-                            logger.info(f"    ✓ {product.get('name', 'N/A')[:40]:40s} ${product.get('sale_price', 0):.2f}{on_sale}")
-                except Exception as e:
-                    logger.debug(f"Error parsing card {i}: {e}")
-            
-            logger.info(f"  Extracted {len(products)} valid products")
-                    
+            return await page.evaluate(EXTRACT_CARDS_CALL)
         except Exception as e:
             logger.error(f"Error scraping page {page_num}: {e}")
-        
-        return products
+            return []
+    
+    def parse_cards(self, product_cards: List[Dict], page_num: int) -> Iterator[Dict]:
+        """Yield products from one page's raw card dicts, one at a time"""
+        
+        if not product_cards:
+            logger.warning(f"  No products found on page {page_num}")
+            return
+        
+        logger.info(f"  Page {page_num}: Found {len(product_cards)} product cards")
+        
+        extracted = 0
+        for i, card in enumerate(product_cards):
+            try:
+                product = self.parse_product_card(card)
+            except Exception as e:
+                logger.debug(f"Error parsing card {i}: {e}")
+                continue
+            
+            if product and product.get('name'):
+                extracted += 1
+                if i < 5:  # Debug first 5
+                    on_sale = " [SALE]" if product.get('saving', 0) > 0 else ""
+                    logger.info(f"    ✓ {product.get('name', 'N/A')[:40]:40s} ${product.get('sale_price', 0):.2f}{on_sale}")
+                yield product
+        
+        logger.info(f"  Extracted {extracted} valid products")
     
-    async def parse_product_card(self, card) -> Dict:
-        """Extract data from a product card"""
+    def parse_product_card(self, card: Dict) -> Dict:
+        """Extract data from a product card (as returned by EXTRACT_CARDS_JS)"""
         
         try:
-            full_text = await card.inner_text()
+            full_text = card['text'] or ''
             
             # 1. GET PRODUCT NAME
-            name = await self.extract_name(card)
+            name = self.extract_name(card)
             if not name:
                 return None
             
             # 2. GET PRICE
-            price_data = await self.extract_price(card, full_text)
+            price_data = self.extract_price(card, full_text)
             if not price_data:
                 return None
             
             # 3. GET SKU
-            sku = await self.extract_sku(card)
+            sku = self.extract_sku(card)
             
             # 4. GET BRAND
             brand = "Mad Butcher"  # All products are Mad Butcher brand
@@ -102,71 +394,31 @@ class MadButcherScraper:
             logger.debug(f"Error parsing card: {e}")
             return None
     
-    async def extract_name(self, card) -> str:
-        """Extract product name"""
-        
-        def is_valid_product_name(text: str) -> bool:
-            """Filter out non-product text"""
-            if not text or len(text.strip()) < 5:  # Increased from 3 to 5
-                return False
-            
-            text_lower = text.lower()
-            
-            # Filter out common non-product text
-            invalid_phrases = [
-                'christmas hours',
-                'opening hours',
-                'holiday hours',
-                'specials!',
-                'specials',
-                'closed',
-                'contact us',
-                'add to cart',
-                'select options',
-                'view details',
-                'shop now'
-            ]
-            
-            if any(phrase in text_lower for phrase in invalid_phrases):
-                return False
-            
-            # Must not start with $
-            if text.startswith('$'):
-                return False
-            
-            # Filter out very short names that end with !
-            if len(text) < 12 and text.endswith('!'):
-                return False
-            
-            return True
+    def name_candidates(self, card: Dict):
+        """Candidate names in strategy priority order (lazy, so the first hit stops the scan)"""
         
         # Strategy 1: WooCommerce product title
-        name_elem = await card.query_selector('.woocommerce-loop-product__title, h2, h3, .product-title')
-        if name_elem:
-            text = await name_elem.inner_text()
-            if is_valid_product_name(text):
-                return text.strip()
+        if card['title']:
+            yield card['title']
         
-        # Strategy 2: Product link
-        link = await card.query_selector('a.woocommerce-LoopProduct-link, a[href*="product"]')
-        if link:
-            text = await link.inner_text()
-            lines = [l.strip() for l in text.split('\n')]
-            for line in lines:
-                if is_valid_product_name(line):
-                    return line
+        # Strategy 2: Product link, line by line
+        if card['link']:
+            yield from card['link'].split('\n')
         
         # Strategy 3: Any anchor
-        anchors = await card.query_selector_all('a')
-        for anchor in anchors:
-            text = await anchor.inner_text()
-            text = text.strip()
+        yield from card['anchors']
+    
+    def extract_name(self, card: Dict) -> str:
+        """Extract product name"""
+        
+        for text in self.name_candidates(card):
+            text = (text or '').strip()
             if is_valid_product_name(text):
                 return text
         
         return None
     
-    async def extract_price(self, card, full_text: str) -> Dict:
+    def extract_price(self, card: Dict, full_text: str) -> Dict:
         """Extract price information"""
         
         # WooCommerce price structure
@@ -179,29 +431,23 @@ class MadButcherScraper:
         price_per_kg = None
         
         # Try to get sale price
-        price_elem = await card.query_selector('.price ins .woocommerce-Price-amount, .price .amount, bdi')
-        if price_elem:
-            price_text = await price_elem.inner_text()
-            sale_price = self.parse_price_text(price_text)
+        if card['sale'] is not None:
+            sale_price = self.parse_price_text(card['sale'])
         
         # If no sale price found, try regular price
-        if not sale_price:
-            price_elem = await card.query_selector('.price, .woocommerce-Price-amount, bdi')
-            if price_elem:
-                price_text = await price_elem.inner_text()
-                sale_price = self.parse_price_text(price_text)
+        if not sale_price and card['regular'] is not None:
+            sale_price = self.parse_price_text(card['regular'])
         
         # Try to get original price (if on sale)
-        del_elem = await card.query_selector('.price del .woocommerce-Price-amount, del bdi')
-        if del_elem:
-            del_text = await del_elem.inner_text()
-            original_price = self.parse_price_text(del_text)
+        if card['was'] is not None:
+            original_price = self.parse_price_text(card['was'])
+        
+        # Fallback price and unit both come from a single pass over the card text
+        text_price, sold_by_kg = scan_price_and_unit(full_text)
         
         if not sale_price:
             # Fallback: find any price in text
-            matches = re.findall(r'\$\s*(\d+)\.(\d{2})', full_text)
-            if matches:
-                sale_price = float(f"{matches[0][0]}.{matches[0][1]}")
+            sale_price = text_price
         
         if not sale_price or sale_price < 1 or sale_price > 500:
             return None
@@ -210,7 +456,7 @@ class MadButcherScraper:
             original_price = sale_price
         
         # Detect if sold by kg
-        if 'kg' in full_text.lower() or '/kg' in full_text.lower():
+        if sold_by_kg:
             unit_type = "kg"
             price_per_kg = sale_price
         
@@ -225,113 +471,235 @@ class MadButcherScraper:
         """Parse price from text like '$12.99' or '12.99'"""
         try:
             # Remove everything except digits and decimal point
-            clean = re.sub(r'[^\d.]', '', text)
-            return float(clean)
+            return float(_PRICE_CLEAN_RE.sub('', text or '') or '0') or None
         except:
             return None
     
-    async def extract_sku(self, card) -> str:
+    def extract_sku(self, card: Dict) -> str:
         """Extract SKU/product ID"""
         
+        attrs = card['attrs']
+        
         # Try data attributes
         for attr in ['data-product-id', 'data-product_id', 'data-id']:
-            val = await card.get_attribute(attr)
+            val = attrs.get(attr)
             if val:
                 return val
         
         # Try class names (WooCommerce often has post-XXX)
-        class_attr = await card.get_attribute('class')
+        class_attr = attrs.get('class')
         if class_attr:
-            match = re.search(r'post-(\d+)', class_attr)
+            match = _POST_ID_RE.search(class_attr)
             if match:
                 return match.group(1)
         
         return None
     
-    async def scrape_all(self) -> List[Dict]:
-        """Scrape all pages"""
+    def http_client(self):
+        """
+        Client for the static path. With HTTP/2 the page requests are streams
+        multiplexed on one connection (one TCP+TLS setup for the whole scrape);
+        if the server only speaks HTTP/1.1, httpx falls back to a connection
+        per concurrent request. The limit covers both cases.
+        """
+        
+        limits = httpx.Limits(max_connections=self.max_concurrency)
+        
+        return httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=limits,
+            headers={'User-Agent': USER_AGENT, 'Accept-Language': 'en-NZ,en;q=0.9'},
+            follow_redirects=True,
+            timeout=45,
+        )
+    
+    async def fetch_static_page(self, client, page_num: int) -> List[Dict]:
+        """Fetch one listing page over plain HTTP and pull the cards from the server-rendered HTML"""
         
-        logger.info("🥩 Starting Mad Butcher scrape")
+        logger.info(f"📄 Fetching page {page_num} (HTTP)...")
         
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(
-                headless=self.headless,
-                args=[
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-dev-shm-usage',
-                ]
-            )
+        try:
+            response = await client.get(self.page_url(page_num))
+            response.raise_for_status()
+            tree = parse_listing_html(response.content)
+            product_cards = extract_cards_from_tree(tree)
             
-            context = await browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                locale='en-NZ',
-                timezone_id='Pacific/Auckland',
-                # FORCE DUNEDIN LOCATION!
-                geolocation={'latitude': -45.8788, 'longitude': 170.5028},  # Dunedin CBD
-                permissions=['geolocation'],
-            )
+            if page_num == 1:
+                self.last_page = last_page_number(_node_text(node) for node in tree.css(PAGINATION_SELECTOR))
+        except Exception as e:
+            logger.error(f"Error on page {page_num}: {e}")
+            return []
+        
+        return product_cards
+    
+    async def fetch_page(self, context, page_num: int) -> List[Dict]:
+        """Open a tab, load one listing page and pull its product cards"""
+        
+        logger.info(f"📄 Fetching page {page_num}...")
+        page = await context.new_page()
+        
+        try:
+            # Small jitter so concurrent tabs don't hit the site in lockstep
+            await asyncio.sleep(random.uniform(0.5, 1.5))
+            
+            await page.goto(self.page_url(page_num), wait_until='domcontentloaded', timeout=45000)
+            
+            # Carry on as soon as the product grid exists
+            try:
+                await page.wait_for_selector(PRODUCT_SELECTOR, state='attached', timeout=8000)
+            except PlaywrightTimeoutError:
+                pass
             
-            page = await context.new_page()
+            if page_num == 1:
+                self.last_page = last_page_number(await page.evaluate(PAGINATION_LABELS_CALL))
             
-            page_num = 1
-            max_pages = 20
+            return await self.scrape_page(page, page_num)
             
-            while page_num <= max_pages:
-                url = f"{self.base_url}?product-page={page_num}"
-                logger.info(f"📄 Fetching page {page_num}...")
+        except Exception as e:
+            logger.error(f"Error on page {page_num}: {e}")
+            return []
+        finally:
+            await page.close()
+    
+    def add_page(self, product_cards: List[Dict], page_num: int) -> int:
+        """
+        Parse one page of cards, writing each product straight to the CSV when
+        streaming (no per-page product list). Returns how many products it kept.
+        """
+        
+        keep = self.writer.writerow if self.writer is not None else self.products.append
+        
+        count = 0
+        for product in self.parse_cards(product_cards, page_num):
+            self.stats.add(product)
+            keep(product)
+            count += 1
+        
+        return count
+    
+    async def collect_pages(self, fetch, start_page: int = 1) -> int:
+        """
+        Run fetch(page_num) for start_page..max_pages concurrently (bounded by
+        max_concurrency), keep results in page order and stop at the last page
+        (per the pagination widget) or the first empty one. Returns the number
+        of pages with products.
+        """
+        
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def bounded(page_num):
+            async with semaphore:
+                return await fetch(page_num)
+        
+        end_page = min(self.max_pages, self.last_page or self.max_pages)
+        tasks = [
+            asyncio.create_task(bounded(page_num))
+            for page_num in range(start_page, end_page + 1)
+        ]
+        
+        pages_scraped = 0
+        try:
+            for page_num, task in enumerate(tasks, start_page):
+                if not self.add_page(await task, page_num):
+                    logger.info("No products extracted, stopping")
+                    break
                 
-                try:
-                    if page_num > 1:
-                        delay = random.uniform(2, 4)
-                        await asyncio.sleep(delay)
-                    
-                    await page.goto(url, wait_until='domcontentloaded', timeout=45000)
-                    await asyncio.sleep(3)
-                    
-                    page_products = await self.scrape_page(page, page_num)
-                    
-                    if not page_products:
-                        logger.info("No products extracted, stopping")
-                        break
-                    
-                    self.products.extend(page_products)
-                    page_num += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error on page {page_num}: {e}")
+                pages_scraped += 1
+                
+                # Known last page - no need to load an empty one to find the end
+                if self.last_page and page_num >= self.last_page:
+                    logger.info(f"Reached last page ({self.last_page}), stopping")
                     break
+        finally:
+            # Everything past the last page is empty too - don't wait on it
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        return pages_scraped
+    
+    async def scrape_all(self, filename: str = None) -> int:
+        """
+        Scrape all pages and return how many products were found. Given a
+        filename, each page is appended to that CSV as soon as it's scraped
+        and self.products stays empty; otherwise the products are kept in
+        self.products.
+        """
+        
+        logger.info("🥩 Starting Mad Butcher scrape")
+        
+        if not filename:
+            await self.scrape_pages()
+            return self.stats.count
+        
+        with open(filename, 'w', newline='', encoding='utf-8') as f:
+            self.writer = csv.DictWriter(f, fieldnames=COLUMN_ORDER, extrasaction='ignore')
+            self.writer.writeheader()
+            try:
+                await self.scrape_pages()
+            finally:
+                self.writer = None
+        
+        return self.stats.count
+    
+    async def scrape_pages(self):
+        """Scrape every listing page, over HTTP if possible, else in the browser"""
+        
+        # The Woo listing is server-rendered, so plain HTTP usually has everything
+        if httpx is not None:
+            async with self.http_client() as client:
+                first_cards = await self.fetch_static_page(client, 1)
+                
+                if self.add_page(first_cards, 1):
+                    pages_scraped = 1 + await self.collect_pages(
+                        lambda page_num: self.fetch_static_page(client, page_num), start_page=2
+                    )
+                    logger.info(f"✅ Scraped {self.stats.count} total products from {pages_scraped} pages")
+                    return
             
-            await browser.close()
+            logger.info("  No product grid in the server HTML - falling back to Playwright")
+        
+        context = await BrowserPool.acquire_context(
+            self.headless,
+            viewport={'width': 1920, 'height': 1080},
+            user_agent=USER_AGENT,
+            locale='en-NZ',
+            timezone_id='Pacific/Auckland',
+            # FORCE DUNEDIN LOCATION!
+            geolocation={'latitude': -45.8788, 'longitude': 170.5028},  # Dunedin CBD
+            permissions=['geolocation'],
+        )
+        await context.route('**/*', block_unneeded_requests)
+        await context.add_init_script(EXTRACTOR_INIT_JS)
         
-        logger.info(f"✅ Scraped {len(self.products)} total products from {page_num-1} pages")
-        return self.products
+        try:
+            # One tab per page, fetched concurrently
+            pages_scraped = await self.collect_pages(
+                lambda page_num: self.fetch_page(context, page_num)
+            )
+        finally:
+            # Only the context - the pooled browser stays warm for the next run
+            await context.close()
+        
+        logger.info(f"✅ Scraped {self.stats.count} total products from {pages_scraped} pages")
     
     def save_to_csv(self, filename: str = None):
         """Save products to CSV"""
         
         if not filename:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f'madbutcher_products_{timestamp}.csv'
+            filename = self.default_filename()
         
-        df = pd.DataFrame(self.products)
+        stats = RunningStats()
         
-        column_order = ['store', 'sku', 'name', 'brand', 'sale_price', 'original_price', 'price_per_kg', 'unit_type', 'saving', 'scraped_at']
-        column_order = [col for col in column_order if col in df.columns]
-        df = df[column_order]
+        with open(filename, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMN_ORDER, extrasaction='ignore')
+            writer.writeheader()
+            for product in self.products:
+                writer.writerow(product)
+                stats.add(product)
         
-        df.to_csv(filename, index=False)
         logger.info(f"💾 Saved to {filename}")
-        
-        if len(df) > 0:
-            logger.info(f"📊 Stats:")
-            logger.info(f"   Total products: {len(df)}")
-            logger.info(f"   Price range: ${df['sale_price'].min():.2f} - ${df['sale_price'].max():.2f}")
-            logger.info(f"   Avg price: ${df['sale_price'].mean():.2f}")
-            on_sale = df[df['saving'] > 0]
-            if len(on_sale) > 0:
-                logger.info(f"   On sale: {len(on_sale)} products")
-                logger.info(f"   Avg saving: ${on_sale['saving'].mean():.2f}")
+        stats.log()
         
         return filename
 
@@ -345,15 +713,29 @@ def main():
     if args.debug:
         logging.getLogger().setLevel(logging.DEBUG)
     
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    
     scraper = MadButcherScraper(headless=args.headless)
+    filename = scraper.default_filename()
+    
+    async def run():
+        try:
+            # Rows are written as each page comes in
+            return await scraper.scrape_all(filename)
+        finally:
+            await BrowserPool.close()
     
     try:
-        products = asyncio.run(scraper.scrape_all())
+        product_count = asyncio.run(run())
         
-        if products:
-            filename = scraper.save_to_csv()
-            logger.info(f"✅ Success! {len(products)} products saved to {filename}")
+        if product_count:
+            logger.info(f"💾 Saved to {filename}")
+            scraper.stats.log()
+            logger.info(f"✅ Success! {product_count} products saved to {filename}")
         else:
+            # Don't leave a header-only file for the cleanup step to pick up
+            os.remove(filename)
             logger.warning("⚠️  No products found")
             
     except Exception as e:
@@ -14,30 +14,235 @@ Also fixes Club Deal pricing:
 """
 
 import asyncio
-import pandas as pd
 import logging
 import argparse
+import csv
+import os
 import re
 import random
+import time
 import json
 from datetime import datetime
 from typing import List, Dict, Optional
-from playwright.async_api import async_playwright
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from scraper_common import block_unneeded_requests
+
+try:
+    import orjson  # Optional: much faster JSONL rows
+except ImportError:
+    orjson = None
+
+try:
+    import uvloop  # Faster drop-in event loop where available
+except ImportError:
+    uvloop = None
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Price / badge patterns, compiled once (parse_product_card runs for every card)
+# A price with a unit suffix: "12.99 ea" / "12 99 each", "15.99kg" or "19.98 / 1kg".
+# The suffixes are mutually exclusive, so one scan classifies every match by
+# which named group took part.
+_UNIT_PRICE_RE = re.compile(
+    r"(?<!\d)(\d{1,3})[.,\s]*(\d{2})\s*(?:(?P<ea>ea|each)|(?P<per_kg>/\s*(?:1\s*)?kg)|(?P<kg>kg))\b",
+    re.IGNORECASE,
+)
+_GENERIC_RE = re.compile(r"(?<!\d)(\d{1,3})[.,\s]+(\d{2})(?!\d)")
+_CLUB_DOT_RE = re.compile(r"club\s*deal.*?\$?\s*(\d{1,3})\.(\d{2})", re.IGNORECASE | re.DOTALL)
+_CLUB_SEP_RE = re.compile(r"club\s*deal.*?(?<!\d)(\d{1,3})[,\s]+(\d{2})(?!\d)", re.IGNORECASE | re.DOTALL)
+# Button/link text that isn't a product name ("Add to cart", "View more", ...)
+_SKIP_NAME_RE = re.compile(r"\b(?:add|view|cart|more|details|shop|buy)\b", re.IGNORECASE)
+
+# Club Deal wording in lowercased card text
+_CLUB_TOKENS = ("club deal", "clubdeal")
+
+COLUMN_ORDER = [
+    "store", "sku", "name", "brand",
+    "sale_price", "original_price",
+    "price_per_kg", "unit_type",
+    "saving", "is_club_deal", "is_super_saver",
+    "scraped_at",
+]
+
+CARD_SELECTOR = '[data-testid*="product"]'
+
+# Cookies + localStorage after forcing the Dunedin store, shared by every context
+STORE_STATE_FILE = "newworld_dunedin_state.json"
+STORE_STATE_MAX_AGE = 7 * 24 * 3600  # seconds
+COUNT_CARDS_JS = "(selector) => document.querySelectorAll(selector).length"
+# Polled by wait_for_function after a scroll: true once more than n cards are on the page
+CARDS_GREW_JS = "([selector, n]) => document.querySelectorAll(selector).length > n"
+SKU_ATTRIBUTES = ("data-stockcode", "data-sku", "data-product-id", "data-testid")
+
+# Everything parse_product_card needs from every card, in one browser round-trip
+EXTRACT_CARDS_JS = """
+(selector) => Array.from(document.querySelectorAll(selector), card => {
+    const text = el => (el ? el.innerText : null);
+    return {
+        text: card.innerText,
+        anchors: Array.from(card.querySelectorAll('a'), a => a.innerText),
+        headings: ['h3', 'h2', 'h1', 'h4'].map(tag => text(card.querySelector(tag))),
+        title: text(card.querySelector('[class*="name"], [class*="Name"], [class*="title"], [class*="Title"]')),
+        brand: text(card.querySelector('[class*="brand"], [class*="Brand"]')),
+        // Badge hints, lowercased and joined so Python checks each word once per card
+        badge_text: [
+            ...Array.from(card.querySelectorAll('img'), img => `${img.getAttribute('alt') || ''}\\n${img.getAttribute('src') || ''}`),
+            ...Array.from(card.querySelectorAll('[aria-label]'), el => el.getAttribute('aria-label')),
+            ...Array.from(card.querySelectorAll('[data-badge]'), el => el.getAttribute('data-badge')),
+        ].join('\\n').toLowerCase(),
+        promo_text: Array.from(card.querySelectorAll('[data-promotion]'), el => el.getAttribute('data-promotion')).join('\\n').toLowerCase(),
+        // First digit run from the first SKU-ish attribute that has one
+        sku: (() => {
+            for (const attr of %(sku_attributes)s) {
+                const m = (card.getAttribute(attr) || '').match(/\\d+/);
+                if (m) return m[0];
+            }
+            return null;
+        })(),
+    };
+})
+""" % {"sku_attributes": json.dumps(SKU_ATTRIBUTES)}
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _has_word(text: str, word: str) -> bool:
+    """Same as re.search(rf"\b{word}\b", text), via str.find - most card texts have no hit at all"""
+    n = len(word)
+    i = text.find(word)
+    while i != -1:
+        if not (i and _is_word_char(text[i - 1])) and not _is_word_char(text[i + n:i + n + 1] or " "):
+            return True
+        i = text.find(word, i + 1)
+    return False
+
+
+def jsonl_rows(rows: List[Dict]) -> bytes:
+    """Rows as newline-delimited JSON (orjson when installed)"""
+    if orjson is not None:
+        return b"".join(orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE) for row in rows)
+    return "".join(json.dumps(row) + "\n" for row in rows).encode("utf-8")
+
+
+def _to_float(dollars: str, cents: str) -> float:
+    return float(f"{int(dollars)}.{cents}")
+
+
+def _generic_prices(txt: str) -> List[float]:
+    """Every plausible bare price ("12.99", "12 99") in the text"""
+    prices = (_to_float(d, c) for d, c in _GENERIC_RE.findall(txt))
+    return [p for p in prices if 0.5 <= p <= 500]
+
+
+def parse_prices(txt: str, is_club_deal: bool, name: str = "") -> Optional[Dict]:
+    """
+    Sale/original/unit price from a card's text. Pure and typed - no scraper
+    state - so it can be profiled or compiled on its own.
+    """
+    ea_prices: List[float] = []
+    kg_prices: List[float] = []
+    per_kg_prices: List[float] = []
+    for m in _UNIT_PRICE_RE.finditer(txt):
+        price = _to_float(m.group(1), m.group(2))
+        if m.group("ea"):
+            ea_prices.append(price)
+        elif m.group("per_kg"):
+            per_kg_prices.append(price)
+        else:
+            kg_prices.append(price)
+    per_kg_set = set(per_kg_prices)
+
+    unit_type = None
+    original_price = None
+    sale_price = None
+    generic_prices: Optional[List[float]] = None  # Bare prices - only scanned for if needed
+
+    if ea_prices:
+        unit_type = "ea"
+        original_price = ea_prices[-1]
+        sale_price = original_price
+    elif kg_prices:
+        unit_type = "kg"
+        original_price = kg_prices[-1]
+        sale_price = original_price
+    else:
+        generic_prices = _generic_prices(txt)
+        if not generic_prices:
+            return None
+        unit_type = "ea"
+        original_price = max(generic_prices)
+        sale_price = original_price
+
+    result = {"sale_price": sale_price, "original_price": original_price, "unit_type": unit_type}
+
+    if per_kg_prices:
+        result["price_per_kg"] = per_kg_prices[0]
+    elif unit_type == "kg":
+        result["price_per_kg"] = sale_price
+
+    if is_club_deal:
+        badge_price = None
+
+        m = _CLUB_DOT_RE.search(txt)
+        if m:
+            badge_price = _to_float(m.group(1), m.group(2))
+
+        if badge_price is None:
+            m = _CLUB_SEP_RE.search(txt)
+            if m:
+                badge_price = _to_float(m.group(1), m.group(2))
+
+        if badge_price and 0.5 <= badge_price <= 500 and badge_price < result["original_price"] - 0.01:
+            result["sale_price"] = badge_price
+        else:
+            if generic_prices is None:
+                generic_prices = _generic_prices(txt)
+
+            # KEY FIX: remove ALL /kg reference values
+            all_prices = [p for p in generic_prices if p not in per_kg_set]
+
+            discounted = [p for p in all_prices if p < result["original_price"] - 0.01]
+            if discounted:
+                result["sale_price"] = min(discounted)
+
+        # Guardrail: never let /kg ref become EA unit sale
+        if result["unit_type"] == "ea" and result["sale_price"] in per_kg_set:
+            logger.debug(f"Guardrail hit for '{name}'. Resetting sale_price to original.")
+            result["sale_price"] = result["original_price"]
+
+    if result["sale_price"] is None or result["original_price"] is None:
+        return None
+    if not (0.5 <= result["sale_price"] <= 500):
+        return None
+
+    return result
+
 
 class NewWorldScraper:
-    def __init__(self, headless: bool = True):
+    def __init__(self, headless: bool = True, workers: int = 4):
         self.base_url = "https://www.newworld.co.nz/shop/category/meat-poultry-and-seafood"
         self.headless = headless
-        self.products: List[Dict] = []
+        self.workers = workers  # Pages fetched concurrently, one context each
+        # Column-wise (one list per CSV column) - far fewer objects than a dict per row
+        self.columns: Dict[str, list] = {col: [] for col in COLUMN_ORDER}
+        self.product_count = 0
+
+        # Set while scrape_all streams rows to a CSV / JSONL file
+        self.csv_file = None
+        self.writer = None
+        self.jsonl_file = None
 
         # Force Dunedin
         self.store_slug = "dunedin"
         self.geo = {"latitude": -45.8788, "longitude": 170.5028}  # Dunedin CBD
 
+    def default_filename(self, ext: str = "csv") -> str:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return f"newworld_specials_{timestamp}.{ext}"
+
     async def _force_store_state(self, context, page):
         """
         Try to force Dunedin store selection BEFORE navigation.
@@ -101,19 +306,18 @@ class NewWorldScraper:
     async def scrape_page(self, page, page_num: int) -> List[Dict]:
         products: List[Dict] = []
         try:
-            selector = '[data-testid*="product"]'
-            await asyncio.sleep(3)
-
-            product_cards = await page.query_selector_all(selector)
+            product_cards = await page.evaluate(EXTRACT_CARDS_JS, CARD_SELECTOR)
             if not product_cards:
                 logger.warning(f"  No products found on page {page_num}")
                 return []
 
             logger.info(f"  Page {page_num}: Found {len(product_cards)} product cards")
 
+            scraped_at = datetime.now().isoformat()  # One timestamp for the whole page
+
             for i, card in enumerate(product_cards):
                 try:
-                    product = await self.parse_product_card(card)
+                    product = self.parse_product_card(card, scraped_at)
                     if product and product.get("name"):
                         products.append(product)
                         if i < 5:
@@ -136,23 +340,25 @@ class NewWorldScraper:
 
         return products
 
-    async def parse_product_card(self, card) -> Optional[Dict]:
+    def parse_product_card(self, card: Dict, scraped_at: Optional[str] = None) -> Optional[Dict]:
+        """Build a product from one card dict (as returned by EXTRACT_CARDS_JS)"""
         try:
-            full_text = await card.inner_text()
+            full_text = card["text"] or ""
 
-            name = await self.extract_name(card)
+            name = self.extract_name(card)
             if not name:
                 return None
 
-            is_club_deal = await self.is_club_deal(card, full_text)
-            is_super_saver = await self.is_super_saver(card, full_text)
+            text_lower = full_text.lower()
+            is_club_deal = self.is_club_deal(card, text_lower)
+            is_super_saver = self.is_super_saver(card, text_lower)
 
-            price_data = await self.extract_all_prices(card, full_text, is_club_deal, is_super_saver, name)
+            price_data = self.extract_all_prices(card, full_text, is_club_deal, is_super_saver, name)
             if not price_data:
                 return None
 
-            sku = await self.extract_sku(card)
-            brand = await self.extract_brand(card)
+            sku = self.extract_sku(card)
+            brand = self.extract_brand(card)
 
             saving = price_data["original_price"] - price_data["sale_price"]
 
@@ -168,291 +374,300 @@ class NewWorldScraper:
                 "saving": saving,
                 "is_club_deal": is_club_deal,
                 "is_super_saver": is_super_saver,
-                "scraped_at": datetime.now().isoformat(),
+                "scraped_at": scraped_at or datetime.now().isoformat(),
             }
         except Exception as e:
             logger.debug(f"Error parsing card: {e}")
             return None
 
-    async def extract_name(self, card) -> Optional[str]:
-        anchors = await card.query_selector_all("a")
-        for anchor in anchors:
-            text = (await anchor.inner_text()).strip()
-            if text and len(text) > 5 and not text.startswith("$"):
-                skip_words = ["add", "view", "cart", "more", "details", "shop", "buy"]
-                if not any(w in text.lower() for w in skip_words):
-                    return text
-
-        for tag in ["h3", "h2", "h1", "h4"]:
-            elem = await card.query_selector(tag)
-            if elem:
-                text = await elem.inner_text()
-                if text and len(text.strip()) > 5:
-                    return text.strip()
-
-        name_elem = await card.query_selector('[class*="name"], [class*="Name"], [class*="title"], [class*="Title"]')
-        if name_elem:
-            return (await name_elem.inner_text()).strip()
-
-        return None
-
-    async def extract_all_prices(self, card, full_text: str, is_club_deal: bool, is_super_saver: bool, name: str = "") -> Optional[Dict]:
-        def to_float(dollars: str, cents: str) -> float:
-            return float(f"{int(dollars)}.{cents}")
-
-        txt = full_text or ""
-
-        ea_matches = re.findall(r"(?<!\d)(\d{1,3})[.,\s]*(\d{2})\s*(?:ea|each)\b", txt, re.IGNORECASE)
-        ea_prices = [to_float(d, c) for d, c in ea_matches]
-
-        kg_matches = re.findall(r"(?<!\d)(\d{1,3})[.,\s]*(\d{2})\s*kg\b", txt, re.IGNORECASE)
-        kg_prices = [to_float(d, c) for d, c in kg_matches]
-
-        per_kg_matches = re.findall(r"\$?\s*(\d{1,3})[.,\s]*(\d{2})\s*/\s*(?:1\s*)?kg\b", txt, re.IGNORECASE)
-        per_kg_prices = [to_float(d, c) for d, c in per_kg_matches]
-        per_kg_set = set(per_kg_prices)
-
-        unit_type = None
-        original_price = None
-        sale_price = None
-
-        if ea_prices:
-            unit_type = "ea"
-            original_price = ea_prices[-1]
-            sale_price = original_price
-        elif kg_prices:
-            unit_type = "kg"
-            original_price = kg_prices[-1]
-            sale_price = original_price
-        else:
-            generic_matches = re.findall(r"(?<!\d)(\d{1,3})[.,\s]+(\d{2})(?!\d)", txt)
-            generic_prices = [to_float(d, c) for d, c in generic_matches]
-            generic_prices = [p for p in generic_prices if 0.5 <= p <= 500]
-            if not generic_prices:
-                return None
-            unit_type = "ea"
-            original_price = max(generic_prices)
-            sale_price = original_price
-
-        result = {"sale_price": sale_price, "original_price": original_price, "unit_type": unit_type}
-
-        if per_kg_prices:
-            result["price_per_kg"] = per_kg_prices[0]
-        elif unit_type == "kg":
-            result["price_per_kg"] = sale_price
-
-        if is_club_deal:
-            badge_price = None
-
-            m = re.search(r"club\s*deal.*?\$?\s*(\d{1,3})\.(\d{2})", txt, re.IGNORECASE | re.DOTALL)
-            if m:
-                badge_price = to_float(m.group(1), m.group(2))
-
-            if badge_price is None:
-                m = re.search(r"club\s*deal.*?(?<!\d)(\d{1,3})[,\s]+(\d{2})(?!\d)", txt, re.IGNORECASE | re.DOTALL)
-                if m:
-                    badge_price = to_float(m.group(1), m.group(2))
-
-            if badge_price and 0.5 <= badge_price <= 500 and badge_price < result["original_price"] - 0.01:
-                result["sale_price"] = badge_price
-            else:
-                generic_matches = re.findall(r"(?<!\d)(\d{1,3})[.,\s]+(\d{2})(?!\d)", txt)
-                all_prices = [to_float(d, c) for d, c in generic_matches]
-                all_prices = [p for p in all_prices if 0.5 <= p <= 500]
-
-                # KEY FIX: remove ALL /kg reference values
-                if per_kg_set:
-                    all_prices = [p for p in all_prices if p not in per_kg_set]
-
-                discounted = [p for p in all_prices if p < result["original_price"] - 0.01]
-                if discounted:
-                    result["sale_price"] = min(discounted)
-
-            # Guardrail: never let /kg ref become EA unit sale
-            if result["unit_type"] == "ea" and result["sale_price"] in per_kg_set:
-                logger.debug(f"Guardrail hit for '{name}'. Resetting sale_price to original.")
-                result["sale_price"] = result["original_price"]
-
-        if result["sale_price"] is None or result["original_price"] is None:
-            return None
-        if not (0.5 <= result["sale_price"] <= 500):
-            return None
+    def extract_name(self, card: Dict) -> Optional[str]:
+        for text in card["anchors"]:
+            text = (text or "").strip()
+            if len(text) > 5 and not text.startswith("$") and not _SKIP_NAME_RE.search(text):
+                return text
 
-        return result
+        for text in card["headings"]:
+            if text and len(text.strip()) > 5:
+                return text.strip()
 
-    async def is_club_deal(self, card, full_text: str) -> bool:
-        text_lower = (full_text or "").lower()
-        if "club deal" in text_lower or "clubdeal" in text_lower:
-            return True
+        if card["title"] is not None:
+            return card["title"].strip()
 
-        images = await card.query_selector_all("img")
-        for img in images:
-            alt = await img.get_attribute("alt")
-            if alt and "club" in alt.lower():
-                return True
-            src = await img.get_attribute("src")
-            if src and "club" in src.lower():
-                return True
-
-        club_aria = await card.query_selector('[aria-label*="club" i], [aria-label*="Club" i]')
-        if club_aria:
-            return True
+        return None
 
-        club_data = await card.query_selector('[data-badge*="club" i], [data-promotion*="club" i]')
-        if club_data:
-            return True
+    def extract_all_prices(self, card: Dict, full_text: str, is_club_deal: bool, is_super_saver: bool, name: str = "") -> Optional[Dict]:
+        return parse_prices(full_text or "", is_club_deal, name)
 
-        if re.search(r"\bclub\b", text_lower):
+    def is_club_deal(self, card: Dict, text_lower: str) -> bool:
+        """Club Deal badge in the (lowercased) card text, images, aria labels or data attributes"""
+        if any(token in text_lower for token in _CLUB_TOKENS) or _has_word(text_lower, "club"):
             return True
+        return "club" in card["badge_text"] or "club" in card["promo_text"]
 
-        return False
-
-    async def is_super_saver(self, card, full_text: str) -> bool:
-        text_lower = (full_text or "").lower()
-        if "super saver" in text_lower or "supersaver" in text_lower:
-            return True
+    def is_super_saver(self, card: Dict, text_lower: str) -> bool:
+        """Super Saver badge in the (lowercased) card text, images, aria labels or data attributes"""
+        # Covers "super saver" and "supersaver" too
         if "super" in text_lower and "saver" in text_lower:
             return True
+        badge_text = card["badge_text"]
+        return "super" in badge_text or "saver" in badge_text or "super" in card["promo_text"]
 
-        images = await card.query_selector_all("img")
-        for img in images:
-            alt = await img.get_attribute("alt")
-            if alt:
-                alt_lower = alt.lower()
-                if "super" in alt_lower or "saver" in alt_lower:
-                    return True
-            src = await img.get_attribute("src")
-            if src:
-                src_lower = src.lower()
-                if "super" in src_lower or "saver" in src_lower:
-                    return True
-
-        saver_aria = await card.query_selector('[aria-label*="super" i], [aria-label*="saver" i]')
-        if saver_aria:
-            return True
+    def extract_sku(self, card: Dict) -> Optional[str]:
+        return card["sku"]  # Resolved in the browser from SKU_ATTRIBUTES
 
-        saver_data = await card.query_selector('[data-badge*="super" i], [data-badge*="saver" i], [data-promotion*="super" i]')
-        if saver_data:
-            return True
+    def extract_brand(self, card: Dict) -> Optional[str]:
+        if card["brand"] is not None:
+            return card["brand"].strip()
+        return None
 
-        return False
+    async def scrape_all(self, filename: Optional[str] = None) -> List[Dict]:
+        """
+        Scrape all pages. Given a filename, each page is appended (and flushed)
+        to that CSV - or JSONL, for a .jsonl filename - as soon as it's scraped
+        instead of piling up in self.columns.
+        """
+        logger.info("🥩 Starting New World scrape (Dunedin forced + Club Deal fix)")
 
-    async def extract_sku(self, card) -> Optional[str]:
-        for attr in ["data-stockcode", "data-sku", "data-product-id", "data-testid"]:
-            val = await card.get_attribute(attr)
-            if val:
-                match = re.search(r"\d+", val)
-                if match:
-                    return match.group()
-        return None
+        if not filename:
+            await self.scrape_pages()
+            return self.products
 
-    async def extract_brand(self, card) -> Optional[str]:
-        brand_elem = await card.query_selector('[class*="brand"], [class*="Brand"]')
-        if brand_elem:
-            return (await brand_elem.inner_text()).strip()
-        return None
+        if filename.endswith(".jsonl"):
+            with open(filename, "ab") as f:
+                self.jsonl_file = f
+                try:
+                    await self.scrape_pages()
+                finally:
+                    self.jsonl_file = None
+            return self.products
+
+        with open(filename, "w", newline="", encoding="utf-8") as f:
+            self.csv_file = f
+            self.writer = csv.DictWriter(f, fieldnames=COLUMN_ORDER, extrasaction="ignore")
+            self.writer.writeheader()
+            try:
+                await self.scrape_pages()
+            finally:
+                self.csv_file = None
+                self.writer = None
 
-    async def scrape_all(self) -> List[Dict]:
-        logger.info("🥩 Starting New World scrape (Dunedin forced + Club Deal fix)")
+        return self.products
 
+    async def scrape_pages(self):
         async with async_playwright() as p:
             browser = await p.chromium.launch(
                 headless=self.headless,
                 args=[
                     "--disable-blink-features=AutomationControlled",
                     "--disable-dev-shm-usage",
+                    "--blink-settings=imagesEnabled=false",
+                    "--disable-gpu",
+                    "--mute-audio",
+                    # Keep Chromium's memory down over a long run
+                    "--disable-background-networking",
+                    "--disable-features=Translate,BackForwardCache",
+                    "--js-flags=--max-old-space-size=512",
                 ],
             )
 
-            context = await browser.new_context(
-                viewport={"width": 1920, "height": 1080},
-                user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                locale="en-NZ",
-                timezone_id="Pacific/Auckland",
-                geolocation=self.geo,
-                permissions=["geolocation"],
-            )
+            # Seed the store once; each worker gets a context from the snapshot and one reusable tab
+            await self._ensure_store_state(browser)
+            workers = await asyncio.gather(*[self._new_worker(browser) for _ in range(self.workers)])
 
-            await context.set_extra_http_headers({
-                "Accept-Language": "en-NZ,en;q=0.9",
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            })
+            # Idle workers; a page task waits for one, so at most self.workers pages are in flight
+            idle = asyncio.Queue()
+            for worker in workers:
+                idle.put_nowait(worker)
 
-            page = await context.new_page()
+            async def fetch(page_num):
+                worker = await idle.get()
+                try:
+                    return await self._fetch_page(worker, page_num)
+                finally:
+                    idle.put_nowait(worker)
+
+            max_pages = 100
+            pages_scraped = 0
+            tasks = [asyncio.create_task(fetch(page_num)) for page_num in range(1, max_pages + 1)]
+
+            try:
+                # Consume in page order; a slow page doesn't hold up the other workers
+                for task in tasks:
+                    page_products = await task
+                    if not page_products:
+                        logger.info("No products extracted, stopping")
+                        break
 
-            await page.add_init_script("""
-                Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
-            """)
+                    self.add_page(page_products)
+                    pages_scraped += 1
+            finally:
+                # Everything past the first empty page is empty too
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
 
+            await browser.close()
+
+        logger.info(f"✅ Scraped {self.product_count} total products from {pages_scraped} pages")
+
+    def add_page(self, page_products: List[Dict]):
+        """Keep one page of products - written straight to the CSV when streaming"""
+        self.product_count += len(page_products)
+
+        if self.jsonl_file is not None:
+            self.jsonl_file.write(jsonl_rows(page_products))
+            self.jsonl_file.flush()
+        elif self.writer is not None:
+            self.writer.writerows(page_products)
+            self.csv_file.flush()  # A crash mid-run still leaves the pages so far
+        else:
+            self.add_rows(page_products)
+
+    def add_rows(self, rows):
+        """Append product dicts to self.columns"""
+        for row in rows:
+            for col, values in self.columns.items():
+                values.append(row.get(col))
+
+    @property
+    def products(self) -> List[Dict]:
+        """self.columns as a list of product dicts (built on demand)"""
+        return [dict(zip(COLUMN_ORDER, row)) for row in zip(*self.columns.values())]
+
+    async def _new_context(self, browser, storage_state: Optional[str] = None):
+        """Browser context pinned to Dunedin by geolocation (and saved store state, if given)"""
+        context = await browser.new_context(
+            storage_state=storage_state,
+            viewport={"width": 1920, "height": 1080},
+            user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+            locale="en-NZ",
+            timezone_id="Pacific/Auckland",
+            geolocation=self.geo,
+            permissions=["geolocation"],
+        )
+
+        await context.set_extra_http_headers({
+            "Accept-Language": "en-NZ,en;q=0.9",
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        })
+
+        await context.route("**/*", block_unneeded_requests)
+
+        await context.add_init_script("""
+            Object.defineProperty(navigator, 'webdriver', { get: () => undefined });
+        """)
+
+        return context
+
+    async def _ensure_store_state(self, browser):
+        """
+        Snapshot the forced Dunedin store state (cookies + localStorage) to
+        STORE_STATE_FILE so every context can load it instead of re-seeding.
+        Re-seeded when missing or older than STORE_STATE_MAX_AGE.
+        """
+        try:
+            age = time.time() - os.path.getmtime(STORE_STATE_FILE)
+        except OSError:
+            age = None
+
+        if age is not None and age < STORE_STATE_MAX_AGE:
+            logger.info(f"🏪 Reusing saved store state ({STORE_STATE_FILE})")
+            return
+
+        context = await self._new_context(browser)
+        try:
             # ✅ Force store selection state before scraping
+            page = await context.new_page()
             await self._force_store_state(context, page)
+            await context.storage_state(path=STORE_STATE_FILE)
+            logger.info(f"🏪 Saved store state to {STORE_STATE_FILE}")
+        finally:
+            await context.close()
+
+    async def _new_worker(self, browser) -> Dict:
+        """Store-state context plus the tab it navigates from page to page"""
+        context = await self._new_context(browser, storage_state=STORE_STATE_FILE)
+        page = await context.new_page()
+        return {"context": context, "page": page}
+
+    async def _wait_for_products(self, page, page_num: int):
+        """Wait for the product grid instead of sleeping a fixed time (one reload retry)"""
+        for attempt in range(2):
+            try:
+                await page.wait_for_selector(CARD_SELECTOR, timeout=15000)
+                break
+            except PlaywrightTimeoutError:
+                if attempt == 0:
+                    logger.debug(f"  No product grid on page {page_num} yet, reloading")
+                    await page.reload(wait_until="commit", timeout=45000)
+
+        # Let prices/badges hydrate, but don't hang on chatty analytics
+        try:
+            await page.wait_for_load_state("networkidle", timeout=5000)
+        except PlaywrightTimeoutError:
+            pass
 
-            page_num = 1
-            max_pages = 100
+    async def _scroll_until_stable(self, page, max_scrolls: int = 10):
+        """Keep scrolling while lazy loading adds cards; stop after a scroll adds none within 2s"""
+        count = await page.evaluate(COUNT_CARDS_JS, CARD_SELECTOR)
+        for _ in range(max_scrolls):
+            await page.evaluate("window.scrollBy(0, document.body.scrollHeight)")
+            try:
+                await page.wait_for_function(CARDS_GREW_JS, arg=[CARD_SELECTOR, count], timeout=2000)
+            except PlaywrightTimeoutError:
+                break  # No growth - every card is in
+            count = await page.evaluate(COUNT_CARDS_JS, CARD_SELECTOR)
+
+    async def _fetch_page(self, worker: Dict, page_num: int) -> List[Dict]:
+        """Navigate the worker's tab to one listing page and scrape it"""
+        url = f"{self.base_url}?store={self.store_slug}&pg={page_num}"
+        logger.info(f"📄 Fetching page {page_num} from {self.store_slug.upper()}...")
+
+        page = worker["page"]
+        try:
+            if page_num > 1:
+                await asyncio.sleep(random.uniform(2, 4))
 
-            while page_num <= max_pages:
-                url = f"{self.base_url}?store={self.store_slug}&pg={page_num}"
-                logger.info(f"📄 Fetching page {page_num} from {self.store_slug.upper()}...")
+            # Only wait for the response to commit - _wait_for_products decides when it's ready
+            await page.goto(url, wait_until="commit", timeout=45000)
+            await self._wait_for_products(page, page_num)
 
-                try:
-                    if page_num > 1:
-                        await asyncio.sleep(random.uniform(2, 4))
-
-                    await page.goto(url, wait_until="domcontentloaded", timeout=45000)
-                    await asyncio.sleep(3 if page_num == 1 else 6)
-
-                    # Verify store on first page
-                    if page_num == 1:
-                        content = (await page.content()).lower()
-                        if "collect from new world timaru" in content:
-                            logger.error("❌ STILL ON TIMARU. Store is being overridden by site state.")
-                            logger.error("   Next step: we will need to capture the exact store cookie/localStorage key New World uses.")
-                            logger.error("   (But scraper will continue for now.)")
-                        elif "collect from new world dunedin" in content or "dunedin" in content:
-                            logger.info("✅ Confirmed on Dunedin store!")
-
-                    # Human-ish behavior
-                    for _ in range(3):
-                        await page.evaluate(f"window.scrollBy(0, {random.randint(300, 600)})")
-                        await asyncio.sleep(random.uniform(0.5, 1.5))
-
-                    await page.mouse.move(random.randint(100, 800), random.randint(100, 600))
-                    await asyncio.sleep(0.5)
-
-                    page_products = await self.scrape_page(page, page_num)
-                    if not page_products:
-                        logger.info("No products extracted, stopping")
-                        break
+            # Verify store on first page
+            if page_num == 1:
+                content = (await page.content()).lower()
+                if "collect from new world timaru" in content:
+                    logger.error("❌ STILL ON TIMARU. Store is being overridden by site state.")
+                    logger.error("   Next step: we will need to capture the exact store cookie/localStorage key New World uses.")
+                    logger.error("   (But scraper will continue for now.)")
+                elif "collect from new world dunedin" in content or "dunedin" in content:
+                    logger.info("✅ Confirmed on Dunedin store!")
 
-                    self.products.extend(page_products)
-                    page_num += 1
+            await self._scroll_until_stable(page)
 
-                except Exception as e:
-                    logger.error(f"Error on page {page_num}: {e}")
-                    break
+            await page.mouse.move(random.randint(100, 800), random.randint(100, 600))
 
-            await browser.close()
+            return await self.scrape_page(page, page_num)
 
-        logger.info(f"✅ Scraped {len(self.products)} total products from {page_num - 1} pages")
+        except Exception as e:
+            logger.error(f"Error on page {page_num}: {e}")
+            return []
+
+    def load_jsonl(self, filename: str) -> List[Dict]:
+        """Read rows written by a --jsonl run back into self.columns"""
+        loads = orjson.loads if orjson is not None else json.loads
+        with open(filename, "rb") as f:
+            self.add_rows(loads(line) for line in f if line.strip())
         return self.products
 
     def save_to_csv(self, filename: Optional[str] = None) -> str:
         if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"newworld_specials_{timestamp}.csv"
+            filename = self.default_filename()
 
-        df = pd.DataFrame(self.products)
+        with open(filename, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(COLUMN_ORDER)
+            writer.writerows(zip(*self.columns.values()))
 
-        column_order = [
-            "store", "sku", "name", "brand",
-            "sale_price", "original_price",
-            "price_per_kg", "unit_type",
-            "saving", "is_club_deal", "is_super_saver",
-            "scraped_at",
-        ]
-        df = df[[c for c in column_order if c in df.columns]]
-
-        df.to_csv(filename, index=False)
         logger.info(f"💾 Saved to {filename}")
         return filename
 
@@ -461,18 +676,33 @@ def main():
     parser = argparse.ArgumentParser(description="New World Scraper - Dunedin forced + Club Deal fix")
     parser.add_argument("--debug", action="store_true", help="Enable debug logging")
     parser.add_argument("--headless", action="store_true", help="Run in headless mode")
+    parser.add_argument("--jsonl", action="store_true", help="Stream rows to a .jsonl file instead of CSV")
+    parser.add_argument("--to-csv", metavar="JSONL", help="Convert a .jsonl file from a --jsonl run to CSV and exit")
     args = parser.parse_args()
 
     if args.debug:
         logging.getLogger().setLevel(logging.DEBUG)
 
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
     scraper = NewWorldScraper(headless=args.headless)
 
-    products = asyncio.run(scraper.scrape_all())
-    if products:
-        fn = scraper.save_to_csv()
-        logger.info(f"✅ Success! {len(products)} products saved to {fn}")
+    if args.to_csv:
+        scraper.load_jsonl(args.to_csv)
+        scraper.save_to_csv(os.path.splitext(args.to_csv)[0] + ".csv")
+        return
+
+    filename = scraper.default_filename("jsonl" if args.jsonl else "csv")
+
+    # Rows are written as each page comes in
+    asyncio.run(scraper.scrape_all(filename))
+    if scraper.product_count:
+        logger.info(f"💾 Saved to {filename}")
+        logger.info(f"✅ Success! {scraper.product_count} products saved to {filename}")
     else:
+        # Don't leave a header-only file for the cleanup step to pick up
+        os.remove(filename)
         logger.warning("⚠️  No products found")
 
 
@@ -8,24 +8,84 @@ PAK'nSAVE Scraper - FIXED VERSION V3
 """
 
 import asyncio
-import pandas as pd
+import csv
 import logging
 import argparse
 import re
 import random
+import json
 from datetime import datetime
 from typing import List, Dict
-from playwright.async_api import async_playwright
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+from scraper_common import block_unneeded_requests
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Price / ID patterns, compiled once (parse_product_card runs for every card)
+# Unit prices ("3.79 ea", "9.99 kg") and per kg references ("$18.95/1kg") in one scan.
+# The two never overlap (only the reference has a "/"), so group 4 tells them apart.
+_PRICE_SCAN_RE = re.compile(
+    r'(\d+)[.,\s]*(\d{2})\s*(ea|kg|each)|\$?(\d+\.\d{2})\s*/\s*(?:1)?kg',
+    re.IGNORECASE,
+)
+_ANY_PRICE_RE = re.compile(r'(\d+)\.(\d{2})')
+_DIGITS_RE = re.compile(r'\d+')
+# Button/link text that isn't a product name ("Add to cart", "View more", ...)
+_SKIP_NAME_RE = re.compile(r'\b(?:add|view|cart|more|details|shop|buy)\b', re.IGNORECASE)
+
+# CSV columns, in order, with the pyarrow type each gets in the Parquet dataset
+PRODUCT_COLUMNS = {
+    'store': 'string',
+    'product_id': 'string',
+    'name': 'string',
+    'brand': 'string',
+    'price': 'double',
+    'price_per_kg': 'double',
+    'unit_type': 'string',
+    'promo_price': 'double',
+    'saving': 'double',
+    'is_everyday_low': 'bool',
+    'is_extra_low': 'bool',
+    'is_super_deal': 'bool',
+    'scraped_at': 'string',
+}
+
+# Product cards have testid like "product-5131155-KGM-000"
+CARD_SELECTOR = '[data-testid^="product-"][data-testid*="-"]'
+COUNT_CARDS_JS = '(selector) => document.querySelectorAll(selector).length'
+# Polled by wait_for_function after the scroll: true once more than n cards are on the page
+CARDS_GREW_JS = '([selector, n]) => document.querySelectorAll(selector).length > n'
+
+PRODUCT_ID_ATTRIBUTES = ('data-stockcode', 'data-sku', 'data-product-id', 'data-testid')
+
+# Everything parse_product_card needs from every card, in one browser round-trip
+EXTRACT_CARDS_JS = """
+(selector) => Array.from(document.querySelectorAll(selector), card => {
+    const text = el => (el ? el.innerText : null);
+    const attrs = {};
+    for (const attr of %(id_attributes)s) attrs[attr] = card.getAttribute(attr);
+    return {
+        text: card.innerText,
+        anchors: Array.from(card.querySelectorAll('a'), a => a.innerText),
+        headings: ['h3', 'h2', 'h1', 'h4'].map(tag => text(card.querySelector(tag))),
+        title: text(card.querySelector('[class*="name"], [class*="Name"], [class*="title"]')),
+        badge_labels: Array.from(card.querySelectorAll('.owfhtzj svg[aria-label]'), svg => svg.getAttribute('aria-label')),
+        attrs,
+        brand: text(card.querySelector('[class*="brand"], [class*="Brand"]')),
+    };
+})
+""" % {"id_attributes": json.dumps(PRODUCT_ID_ATTRIBUTES)}
+
+
 class PaknsaveScraper:
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, workers=4):
         self.base_url = "https://www.paknsave.co.nz/shop/category/meat-poultry-and-seafood"
         self.headless = headless
+        self.workers = workers  # Pages fetched concurrently, one browser context each
         self.products = []
+        self._seen_ids = set()  # product_ids already in self.products
         
     async def scrape_page(self, page, page_num: int) -> List[Dict]:
         """Scrape products from a single page"""
@@ -33,11 +93,8 @@ class PaknsaveScraper:
         products = []
         
         try:
-            # Use correct selector - product cards have testid like "product-5131155-KGM-000"
-            selector = '[data-testid^="product-"][data-testid*="-"]'
-            await asyncio.sleep(3)
-            
-            product_cards = await page.query_selector_all(selector)
+            # _fetch_page has already waited for CARD_SELECTOR
+            product_cards = await page.evaluate(EXTRACT_CARDS_JS, CARD_SELECTOR)
             
             if not product_cards:
                 logger.warning(f"  No products found on page {page_num}")
@@ -45,9 +102,11 @@ class PaknsaveScraper:
             
             logger.info(f"  Page {page_num}: Found {len(product_cards)} product cards")
             
+            debug = logger.isEnabledFor(logging.DEBUG)
+            
             for i, card in enumerate(product_cards):
                 try:
-                    product = await self.parse_product_card(card)
+                    product = self.parse_product_card(card)
                     if product and product.get('name'):
                         products.append(product)
                         
@@ -64,14 +123,9 @@ class PaknsaveScraper:
                             logger.info(f"    ✓ {product.get('name', 'N/A')[:35]:35s} ${product.get('price', 0):.2f}{badge_str}")
                         
                         # Debug badge detection on first product with a badge
-                        if i == 0 or (i < 20 and (product.get('is_everyday_low') or product.get('is_extra_low') or product.get('is_super_deal'))):
-                            # Check what badge SVG exists
-                            badge_div = await card.query_selector('.owfhtzj')
-                            if badge_div:
-                                badge_svg = await badge_div.query_selector('svg[aria-label]')
-                                if badge_svg:
-                                    aria = await badge_svg.get_attribute('aria-label')
-                                    logger.debug(f"    Badge SVG aria-label: '{aria}'")
+                        if debug and (i == 0 or (i < 20 and (product.get('is_everyday_low') or product.get('is_extra_low') or product.get('is_super_deal')))):
+                            if card['badge_labels']:
+                                logger.debug(f"    Badge SVG aria-label: '{card['badge_labels'][0]}'")
                         
                 except Exception as e:
                     logger.debug(f"Error parsing card {i}: {e}")
@@ -83,35 +137,36 @@ class PaknsaveScraper:
         
         return products
     
-    async def parse_product_card(self, card) -> Dict:
-        """Extract data from a product card"""
+    def parse_product_card(self, card: Dict) -> Dict:
+        """Extract data from a product card (a dict from EXTRACT_CARDS_JS)"""
         
         try:
-            full_text = await card.inner_text()
+            full_text = card['text']
             
             # 1. Extract product name
-            name = await self.extract_name(card)
+            name = self.extract_name(card)
             if not name:
                 return None
             
             # 2. Extract prices (unit price + per kg reference)
-            price_data = await self.extract_all_prices(card, full_text)
+            price_data = self.extract_all_prices(card, full_text)
             if not price_data:
                 return None
             
             # 3. Detect badges
-            is_everyday_low = await self.is_everyday_low(card, full_text)
-            is_extra_low = await self.is_extra_low(card, full_text)
-            is_super_deal = await self.is_super_deal(card, full_text)
+            text_lower = full_text.lower()  # Once for all three fallbacks
+            is_everyday_low = self.is_everyday_low(card, text_lower)
+            is_extra_low = self.is_extra_low(card, text_lower)
+            is_super_deal = self.is_super_deal(card, text_lower)
             
-            if is_everyday_low or is_extra_low or is_super_deal:
+            if (is_everyday_low or is_extra_low or is_super_deal) and logger.isEnabledFor(logging.DEBUG):
                 logger.debug(f"    Badge detected: '{name[:30]}' - everyday={is_everyday_low}, extra={is_extra_low}, super={is_super_deal}")
             
             # 4. Extract product ID
-            product_id = await self.extract_product_id(card)
+            product_id = self.extract_product_id(card)
             
             # 5. Extract brand
-            brand = await self.extract_brand(card)
+            brand = self.extract_brand(card)
             
             # PAK'nSAVE doesn't show separate sale/original prices
             # The badge just indicates it's a good deal, but price is the price
@@ -135,36 +190,25 @@ class PaknsaveScraper:
             logger.debug(f"Error parsing card: {e}")
             return None
     
-    async def extract_name(self, card) -> str:
+    def extract_name(self, card: Dict) -> str:
         """Extract product name"""
         
         # Strategy 1: Look for anchor tags
-        anchors = await card.query_selector_all('a')
-        for anchor in anchors:
-            text = await anchor.inner_text()
+        for text in card['anchors']:
             text = text.strip()
             
-            if text and len(text) > 5 and not text.startswith('$'):
-                skip_words = ['add', 'view', 'cart', 'more', 'details', 'shop', 'buy']
-                if not any(word in text.lower() for word in skip_words):
-                    return text
+            if text and len(text) > 5 and not text.startswith('$') and not _SKIP_NAME_RE.search(text):
+                return text
         
         # Strategy 2: Look for headings
-        for tag in ['h3', 'h2', 'h1', 'h4']:
-            elem = await card.query_selector(tag)
-            if elem:
-                text = await elem.inner_text()
-                if text and len(text.strip()) > 5:
-                    return text.strip()
+        for text in card['headings']:
+            if text and len(text.strip()) > 5:
+                return text.strip()
         
         # Strategy 3: Look for name/title classes
-        name_elem = await card.query_selector('[class*="name"], [class*="Name"], [class*="title"]')
-        if name_elem:
-            return await name_elem.inner_text()
-        
-        return None
+        return card['title']
     
-    async def extract_all_prices(self, card, full_text: str) -> Dict:
+    def extract_all_prices(self, card: Dict, full_text: str) -> Dict:
         """
         Extract unit price AND per kg reference price
         
@@ -180,17 +224,22 @@ class PaknsaveScraper:
         
         # Step 1: Find UNIT prices (ea or kg) - these are the MAIN prices
         # Pattern: "3.79 ea", "11.49 ea", "9.99 kg", "25.49 kg"
-        unit_prices = re.findall(r'(\d+)[.,\s]*(\d{2})\s*(ea|kg|each)', full_text, re.IGNORECASE)
-        
         # Step 2: Find PER KG REFERENCE prices
         # Pattern: "$18.95/1kg", "$10.45/kg"
-        per_kg_ref = re.findall(r'\$?(\d+\.\d{2})\s*/\s*(?:1)?kg', full_text, re.IGNORECASE)
+        unit_prices = []
+        per_kg_ref = []
+        for match in _PRICE_SCAN_RE.finditer(full_text):
+            if match.group(4):
+                per_kg_ref.append(match.group(4))
+            else:
+                unit_prices.append(match.group(1, 2, 3))
         
-        logger.debug(f"    Price extraction: unit={unit_prices}, per_kg_ref={per_kg_ref}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"    Price extraction: unit={unit_prices}, per_kg_ref={per_kg_ref}")
         
         if not unit_prices:
             # Fallback: try to find any reasonable price
-            all_prices = re.findall(r'(\d+)\.(\d{2})', full_text)
+            all_prices = _ANY_PRICE_RE.findall(full_text)
             if all_prices:
                 dollars, cents = all_prices[0]
                 price = float(f"{dollars}.{cents}")
@@ -222,50 +271,44 @@ class PaknsaveScraper:
             'unit_type': unit_type
         }
     
-    async def is_everyday_low(self, card, full_text: str) -> bool:
+    def is_everyday_low(self, card: Dict, text_lower: str) -> bool:
         """Check for Everyday Low badge (Badge 4701)"""
         
         # PRIMARY: Check for badge 4701 SVG in .owfhtzj div
-        badge_svg = await card.query_selector('.owfhtzj svg[aria-label*="4701"]')
-        if badge_svg:
+        if any('4701' in aria for aria in card['badge_labels']):
             return True
         
         # FALLBACK: Check text (less reliable)
-        text_lower = full_text.lower()
         if 'everyday low' in text_lower or 'everydaylow' in text_lower:
             return True
         
         return False
     
-    async def is_extra_low(self, card, full_text: str) -> bool:
+    def is_extra_low(self, card: Dict, text_lower: str) -> bool:
         """Check for Extra Low badge (Badge 6000)"""
         
         # PRIMARY: Check for badge 6000 SVG in .owfhtzj div
-        badge_svg = await card.query_selector('.owfhtzj svg[aria-label*="6000"]')
-        if badge_svg:
+        if any('6000' in aria for aria in card['badge_labels']):
             return True
         
         # FALLBACK: Check text (less reliable)
-        text_lower = full_text.lower()
         if 'extra low' in text_lower or 'extralow' in text_lower:
             return True
         
         return False
     
-    async def is_super_deal(self, card, full_text: str) -> bool:
+    def is_super_deal(self, card: Dict, text_lower: str) -> bool:
         """Check for Super Deal badge (Badge number unknown - might be 5000, 7000, etc.)"""
         
         # Check for any badge that's NOT 4701 (Everyday) or 6000 (Extra Low)
         # Super Deal might be badge 5000, 7000, or similar
-        badge_svg = await card.query_selector('.owfhtzj svg[aria-label]')
-        if badge_svg:
-            aria = await badge_svg.get_attribute('aria-label') or ''
+        if card['badge_labels']:
+            aria = card['badge_labels'][0]
             # If it has a badge but it's not 4701 or 6000, might be Super Deal
             if 'badge' in aria.lower() and '4701' not in aria and '6000' not in aria:
                 return True
         
         # FALLBACK: Check text
-        text_lower = full_text.lower()
         if 'super deal' in text_lower or 'superdeal' in text_lower:
             return True
         
@@ -274,26 +317,22 @@ class PaknsaveScraper:
         
         return False
     
-    async def extract_product_id(self, card) -> str:
+    def extract_product_id(self, card: Dict) -> str:
         """Extract product ID"""
         
-        for attr in ['data-stockcode', 'data-sku', 'data-product-id', 'data-testid']:
-            val = await card.get_attribute(attr)
+        for attr in PRODUCT_ID_ATTRIBUTES:
+            val = card['attrs'].get(attr)
             if val:
-                match = re.search(r'\d+', val)
+                match = _DIGITS_RE.search(val)
                 if match:
                     return match.group()
         
         return None
     
-    async def extract_brand(self, card) -> str:
+    def extract_brand(self, card: Dict) -> str:
         """Extract brand"""
         
-        brand_elem = await card.query_selector('[class*="brand"], [class*="Brand"]')
-        if brand_elem:
-            return await brand_elem.inner_text()
-        
-        return None
+        return card['brand']
     
     async def scrape_all(self) -> List[Dict]:
         """Scrape all pages"""
@@ -309,70 +348,131 @@ class PaknsaveScraper:
                 ]
             )
             
-            context = await browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                locale='en-NZ',
-                timezone_id='Pacific/Auckland',
-                # FORCE DUNEDIN LOCATION!
-                geolocation={'latitude': -45.8788, 'longitude': 170.5028},  # Dunedin CBD
-                permissions=['geolocation'],
-            )
-            
-            await context.set_extra_http_headers({
-                'Accept-Language': 'en-NZ,en;q=0.9',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            })
+            # Each worker has its own context (no shared session) and one reusable tab
+            workers = await asyncio.gather(*[self._new_worker(browser) for _ in range(self.workers)])
             
-            page = await context.new_page()
+            # Idle workers; a page task waits for one, so at most self.workers pages are in flight
+            idle = asyncio.Queue()
+            for worker in workers:
+                idle.put_nowait(worker)
             
-            await page.add_init_script("""
-                Object.defineProperty(navigator, 'webdriver', {
-                    get: () => undefined
-                });
-            """)
+            async def fetch(page_num):
+                worker = await idle.get()
+                try:
+                    return await self._fetch_page(worker, page_num)
+                finally:
+                    idle.put_nowait(worker)
             
-            page_num = 1
             max_pages = 100
+            pages_scraped = 0
+            tasks = [asyncio.create_task(fetch(page_num)) for page_num in range(1, max_pages + 1)]
             
-            while page_num <= max_pages:
-                url = f"{self.base_url}?store=dunedin&pg={page_num}"
-                logger.info(f"📄 Fetching page {page_num} from DUNEDIN...")
-                
-                try:
-                    if page_num > 1:
-                        delay = random.uniform(2, 4)
-                        await asyncio.sleep(delay)
-                    
-                    await page.goto(url, wait_until='domcontentloaded', timeout=45000)
-                    await asyncio.sleep(3 if page_num == 1 else 6)
-                    
-                    # Human-like scrolling
-                    for _ in range(3):
-                        await page.evaluate(f'window.scrollBy(0, {random.randint(300, 600)})')
-                        await asyncio.sleep(random.uniform(0.5, 1.5))
-                    
-                    await page.mouse.move(random.randint(100, 800), random.randint(100, 600))
-                    await asyncio.sleep(0.5)
-                    
-                    page_products = await self.scrape_page(page, page_num)
-                    
+            try:
+                # Consume in page order; a slow page doesn't hold up the other workers
+                for task in tasks:
+                    page_products = await task
                     if not page_products:
                         logger.info("No products extracted, stopping")
                         break
                     
-                    self.products.extend(page_products)
-                    page_num += 1
+                    # Deduplicate here, in page order, not in the workers (they finish out of order)
+                    new_products = self.new_products(page_products)
+                    if not new_products:
+                        logger.info("No new products on this page (pagination wrapped), stopping")
+                        break
                     
-                except Exception as e:
-                    logger.error(f"Error on page {page_num}: {e}")
-                    break
+                    self.products.extend(new_products)
+                    pages_scraped += 1
+            finally:
+                # Everything past the first empty page is empty too
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
             
             await browser.close()
         
-        logger.info(f"✅ Scraped {len(self.products)} total products from {page_num-1} pages")
+        logger.info(f"✅ Scraped {len(self.products)} total products from {pages_scraped} pages")
         return self.products
     
+    def new_products(self, page_products: List[Dict]) -> List[Dict]:
+        """Products whose product_id hasn't been seen yet (products without an ID are kept)"""
+        
+        new = []
+        for product in page_products:
+            product_id = product.get('product_id')
+            if product_id:
+                if product_id in self._seen_ids:
+                    continue
+                self._seen_ids.add(product_id)
+            new.append(product)
+        
+        return new
+    
+    async def _new_worker(self, browser) -> Dict:
+        """Dunedin-pinned context plus the tab it navigates from page to page"""
+        
+        context = await browser.new_context(
+            viewport={'width': 1920, 'height': 1080},
+            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            locale='en-NZ',
+            timezone_id='Pacific/Auckland',
+            # FORCE DUNEDIN LOCATION!
+            geolocation={'latitude': -45.8788, 'longitude': 170.5028},  # Dunedin CBD
+            permissions=['geolocation'],
+        )
+        
+        await context.set_extra_http_headers({
+            'Accept-Language': 'en-NZ,en;q=0.9',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        })
+        
+        await context.route('**/*', block_unneeded_requests)
+        
+        await context.add_init_script("""
+            Object.defineProperty(navigator, 'webdriver', {
+                get: () => undefined
+            });
+        """)
+        
+        page = await context.new_page()
+        return {'context': context, 'page': page}
+    
+    async def _fetch_page(self, worker: Dict, page_num: int) -> List[Dict]:
+        """Navigate the worker's tab to one listing page and scrape it"""
+        
+        url = f"{self.base_url}?store=dunedin&pg={page_num}"
+        logger.info(f"📄 Fetching page {page_num} from DUNEDIN...")
+        
+        page = worker['page']
+        try:
+            if page_num > 1:
+                delay = random.uniform(2, 4)
+                await asyncio.sleep(delay)
+            
+            await page.goto(url, wait_until='domcontentloaded', timeout=45000)
+            
+            # Wait for the product grid instead of sleeping a fixed time
+            try:
+                await page.wait_for_selector(CARD_SELECTOR, timeout=15000)
+            except PlaywrightTimeoutError:
+                logger.debug(f"  No product grid on page {page_num} after 15s")
+            
+            # One scroll to the bottom triggers lazy loading; wait for the card count to grow, not the clock
+            count = await page.evaluate(COUNT_CARDS_JS, CARD_SELECTOR)
+            await page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
+            try:
+                await page.wait_for_function(CARDS_GREW_JS, arg=[CARD_SELECTOR, count], timeout=5000)
+            except PlaywrightTimeoutError:
+                pass  # Nothing more to load
+            
+            await asyncio.sleep(random.uniform(0.5, 1.0))  # Small anti-bot jitter
+            
+            return await self.scrape_page(page, page_num)
+            
+        except Exception as e:
+            logger.error(f"Error on page {page_num}: {e}")
+            return []
+    
     def save_to_csv(self, filename: str = None):
         """Save products to CSV"""
         
@@ -380,43 +480,65 @@ class PaknsaveScraper:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = f'paknsave_deals_{timestamp}.csv'
         
-        df = pd.DataFrame(self.products)
-        
-        column_order = ['store', 'product_id', 'name', 'brand', 'price', 'price_per_kg', 
-                       'unit_type', 'promo_price', 'saving', 'is_everyday_low', 
-                       'is_extra_low', 'is_super_deal', 'scraped_at']
-        column_order = [col for col in column_order if col in df.columns]
-        df = df[column_order]
-        
-        df.to_csv(filename, index=False)
+        with open(filename, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(PRODUCT_COLUMNS), extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(self.products)
         logger.info(f"💾 Saved to {filename}")
         
         # Show stats
-        if len(df) > 0:
+        if self.products:
+            prices = [product['price'] for product in self.products]
             logger.info(f"📊 Stats:")
-            logger.info(f"   Total products: {len(df)}")
-            logger.info(f"   Price range: ${df['price'].min():.2f} - ${df['price'].max():.2f}")
-            logger.info(f"   Avg price: ${df['price'].mean():.2f}")
+            logger.info(f"   Total products: {len(prices)}")
+            logger.info(f"   Price range: ${min(prices):.2f} - ${max(prices):.2f}")
+            logger.info(f"   Avg price: ${sum(prices) / len(prices):.2f}")
             
-            everyday = df[df['is_everyday_low'] == True]
-            extra = df[df['is_extra_low'] == True]
-            super_deals = df[df['is_super_deal'] == True]
+            everyday = sum(1 for product in self.products if product['is_everyday_low'])
+            extra = sum(1 for product in self.products if product['is_extra_low'])
+            super_deals = sum(1 for product in self.products if product['is_super_deal'])
             
-            if len(everyday) > 0:
-                logger.info(f"   Everyday Low: {len(everyday)} products")
-            if len(extra) > 0:
-                logger.info(f"   Extra Low: {len(extra)} products")
-            if len(super_deals) > 0:
-                logger.info(f"   Super Deals: {len(super_deals)} products")
+            if everyday > 0:
+                logger.info(f"   Everyday Low: {everyday} products")
+            if extra > 0:
+                logger.info(f"   Extra Low: {extra} products")
+            if super_deals > 0:
+                logger.info(f"   Super Deals: {super_deals} products")
         
         return filename
 
+    
+    def save_to_parquet(self, path: str = 'paknsave.parquet'):
+        """
+        Append products to a Parquet dataset at path, partitioned by store and
+        scrape date. Each run adds new files, so earlier runs are kept; read
+        it back with pyarrow.dataset.dataset(path, partitioning='hive').
+        """
+        
+        try:
+            import pyarrow as pa
+            import pyarrow.compute as pc
+            import pyarrow.parquet as pq
+        except ImportError:
+            logger.error("❌ --parquet needs pyarrow (pip install pyarrow), skipping the Parquet dataset")
+            return None
+        
+        schema = pa.schema([(name, pa.type_for_alias(type_name)) for name, type_name in PRODUCT_COLUMNS.items()])
+        table = pa.Table.from_pylist(self.products, schema=schema)
+        scrape_date = pc.utf8_slice_codeunits(table['scraped_at'], 0, 10)
+        table = table.append_column('scrape_date', scrape_date)
+        
+        pq.write_to_dataset(table, root_path=path, partition_cols=['store', 'scrape_date'], compression='zstd')
+        logger.info(f"💾 Appended {table.num_rows} rows to {path}")
+        
+        return path
 
 def main():
     parser = argparse.ArgumentParser(description='PAK\'nSAVE Scraper')
     parser.add_argument('--run-once', action='store_true', help='Run scraper once and exit')
     parser.add_argument('--debug', action='store_true', help='Enable debug mode')
     parser.add_argument('--headless', action='store_true', help='Run in headless mode')
+    parser.add_argument('--parquet', metavar='PATH', help='Also append products to a Parquet dataset at PATH')
     args = parser.parse_args()
     
     if args.debug:
@@ -429,6 +551,8 @@ def main():
         
         if products:
             filename = scraper.save_to_csv()
+            if args.parquet:
+                scraper.save_to_parquet(args.parquet)
             logger.info(f"✅ Success! {len(products)} products saved to {filename}")
         else:
             logger.warning("⚠️  No products found")
@@ -10,19 +10,82 @@ import logging
 import argparse
 import re
 import random
+import json
 from datetime import datetime
 from typing import List, Dict
-from playwright.async_api import async_playwright
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Name / price / SKU patterns, compiled once (the extractors run for every card)
+_PRICE_LIKE_RE = re.compile(r'^\$?\d+[\s\n.]\d+$')
+_LETTERS_RE = re.compile(r'[a-zA-Z]{3,}')
+_DOLLAR_CENTS_RE = re.compile(r'\$?(\d+)[\s.]?(\d{2})?')
+_ALL_PRICES_RE = re.compile(r'\$(\d+)\.(\d{2})')
+_MULTI_BUY_RE = re.compile(r'for \$(\d+)\.(\d{2})')
+_WAS_RE = re.compile(r'was\s+\$(\d+)\.(\d{2})', re.IGNORECASE)
+_STRUCK_PRICE_RE = re.compile(r'\$?(\d+)\.(\d{2})')
+_DIGITS_RE = re.compile(r'\d+')
+_PRODUCT_URL_RE = re.compile(r'/product/(\d+)')
+
+
+class _KeepDigits(dict):
+    """str.translate table that drops everything but digits (same as re.sub(r'[^\\d]', '', s))"""
+    
+    def __missing__(self, codepoint):
+        keep = codepoint if chr(codepoint).isdecimal() else None
+        self[codepoint] = keep
+        return keep
+
+
+_KEEP_DIGITS = _KeepDigits()
+
+CARD_SELECTOR = '.product-entry'
+# Pack price candidates, tried in order (strategy 2 in extract_pack_price)
+PRICE_SELECTORS = ('[class*="price-dollar"]', '[class*="product-price"]', '[class*="current-price"]', '.price')
+# Crossed-out price candidates, tried in order
+WAS_SELECTORS = ('[class*="was"]', '[class*="crossed"]', '[class*="original"]', 'del', 's')
+SKU_ATTRIBUTES = ('data-stockcode', 'data-sku', 'data-product-id', 'stockcode')
+CARD_ATTRIBUTES = SKU_ATTRIBUTES + ('aria-label', 'title', 'href')
+
+# Everything parse_product_card needs from every card, in one browser round-trip
+EXTRACT_CARDS_JS = """
+(selector) => Array.from(document.querySelectorAll(selector), card => {
+    const text = el => (el ? el.innerText : null);
+    const first = sel => text(card.querySelector(sel));
+    const attrs = {};
+    for (const attr of %(card_attributes)s) attrs[attr] = card.getAttribute(attr);
+    const link = card.querySelector('a');
+    return {
+        text: card.innerText,
+        headings: ['h3', 'h2', 'h1', 'h4'].map(first),
+        product_link: first('a[class*="product"]'),
+        dollars: first('.price-dollars, [class*="price-dollar"]'),
+        cents: first('.price-cents, [class*="price-cent"]'),
+        prices: %(price_selectors)s.map(first),
+        was: %(was_selectors)s.map(first),
+        attrs,
+        link_href: link ? link.getAttribute('href') : null,
+        brand: first('[class*="brand"], [class*="Brand"]'),
+    };
+})
+""" % {
+    'card_attributes': json.dumps(CARD_ATTRIBUTES),
+    'price_selectors': json.dumps(PRICE_SELECTORS),
+    'was_selectors': json.dumps(WAS_SELECTORS),
+}
+
 class WoolworthsScraper:
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, workers=4):
         self.base_url = "https://www.woolworths.co.nz/shop/browse/meat-poultry"
         self.headless = headless
+        self.workers = workers  # Pages fetched concurrently, one tab each
         self.products = []
+        self._playwright = None
+        self._browser = None
+        self._context = None
         
     async def scrape_page(self, page, page_num: int) -> List[Dict]:
         """Scrape products from a single page"""
@@ -30,10 +93,7 @@ class WoolworthsScraper:
         products = []
         
         try:
-            selector = '.product-entry'
-            await asyncio.sleep(3)
-            
-            product_cards = await page.query_selector_all(selector)
+            product_cards = await page.evaluate(EXTRACT_CARDS_JS, CARD_SELECTOR)
             
             if not product_cards:
                 logger.warning(f"  No products found on page {page_num}")
@@ -43,7 +103,7 @@ class WoolworthsScraper:
             
             for i, card in enumerate(product_cards):
                 try:
-                    product = await self.parse_product_card(card)
+                    product = self.parse_product_card(card)
                     if product and product.get('name'):
                         products.append(product)
                         if i < 5:  # Debug first 5
@@ -58,30 +118,32 @@ class WoolworthsScraper:
         
         return products
     
-    async def parse_product_card(self, card) -> Dict:
-        """Extract data from a product card - FIXED VERSION"""
+    def parse_product_card(self, card: Dict) -> Dict:
+        """Extract data from a product card (a dict from EXTRACT_CARDS_JS) - FIXED VERSION"""
         
         try:
+            full_text = card['text']
+            
             # 1. GET PRODUCT NAME
-            name = await self.extract_name(card)
+            name = self.extract_name(card)
             if not name:
                 return None
             
             # 2. GET THE ACTUAL PACK PRICE (the big bold price)
-            sale_price = await self.extract_pack_price(card)
+            sale_price = self.extract_pack_price(card, full_text)
             if not sale_price:
                 return None
             
             # 3. GET ORIGINAL/WAS PRICE (if exists)
-            original_price = await self.extract_original_price(card)
+            original_price = self.extract_original_price(card, full_text)
             if not original_price:
                 original_price = sale_price  # No discount
             
             # 4. GET SKU
-            sku = await self.extract_sku(card)
+            sku = self.extract_sku(card)
             
             # 5. GET BRAND
-            brand = await self.extract_brand(card, name)
+            brand = self.extract_brand(card, name)
             
             # Calculate saving
             saving = 0
@@ -103,7 +165,7 @@ class WoolworthsScraper:
             logger.debug(f"Error parsing card: {e}")
             return None
     
-    async def extract_name(self, card) -> str:
+    def extract_name(self, card: Dict) -> str:
         """Extract product name - IMPROVED with price filtering"""
         
         def is_valid_product_name(text: str) -> bool:
@@ -118,67 +180,60 @@ class WoolworthsScraper:
                 return False
             
             # Reject if it's mostly numbers (like "5 20" or "8 80")
-            numbers_only = re.sub(r'[^\d]', '', text)
+            numbers_only = text.translate(_KEEP_DIGITS)
             if len(numbers_only) > 0 and len(numbers_only) / len(text) > 0.5:  # More than 50% numbers
                 return False
             
             # Reject if it contains price patterns
-            if re.match(r'^\$?\d+[\s\n.]\d+$', text):
+            if _PRICE_LIKE_RE.match(text):
                 return False
             
             # Must contain at least some letters
-            if not re.search(r'[a-zA-Z]{3,}', text):  # At least 3 letters in a row
+            if not _LETTERS_RE.search(text):  # At least 3 letters in a row
                 return False
             
             return True
         
         # Strategy 1: Look for heading tags (most reliable)
-        for tag in ['h3', 'h2', 'h1', 'h4']:
-            elem = await card.query_selector(tag)
-            if elem:
-                text = await elem.inner_text()
-                if is_valid_product_name(text):
-                    return text.strip()
+        for text in card['headings']:
+            if is_valid_product_name(text):
+                return text.strip()
         
         # Strategy 2: Look for product title link
-        link = await card.query_selector('a[class*="product"]')
-        if link:
-            text = await link.inner_text()
+        text = card['product_link']
+        if text is not None:
             lines = text.split('\n')
             for line in lines:
                 if is_valid_product_name(line):
                     return line.strip()
         
         # Strategy 3: Try aria-label (often has clean product name)
-        aria_label = await card.get_attribute('aria-label')
+        aria_label = card['attrs']['aria-label']
         if aria_label and is_valid_product_name(aria_label):
             return aria_label.strip()
         
         # Strategy 4: Title attribute
-        title = await card.get_attribute('title')
+        title = card['attrs']['title']
         if title and is_valid_product_name(title):
             return title.strip()
         
         return None
     
-    async def extract_pack_price(self, card) -> float:
+    def extract_pack_price(self, card: Dict, full_text: str) -> float:
         """
         Extract the ACTUAL PACK PRICE - the big bold number you pay for ONE pack
         NOT multi-buy deals, NOT unit prices
         """
         
         # Strategy 1: Look for price-dollars and price-cents (Woolworths format)
-        dollars_elem = await card.query_selector('.price-dollars, [class*="price-dollar"]')
-        cents_elem = await card.query_selector('.price-cents, [class*="price-cent"]')
+        dollars_text = card['dollars']
+        cents_text = card['cents']
         
-        if dollars_elem and cents_elem:
+        if dollars_text is not None and cents_text is not None:
             try:
-                dollars_text = await dollars_elem.inner_text()
-                cents_text = await cents_elem.inner_text()
-                
                 # Extract just the numbers
-                dollars = re.sub(r'[^\d]', '', dollars_text)
-                cents = re.sub(r'[^\d]', '', cents_text)
+                dollars = dollars_text.translate(_KEEP_DIGITS)
+                cents = cents_text.translate(_KEEP_DIGITS)
                 
                 if dollars:
                     price = float(f"{dollars}.{cents if cents else '00'}")
@@ -188,46 +243,34 @@ class WoolworthsScraper:
                 pass
         
         # Strategy 2: Look for the primary price element (largest/boldest)
-        # This is typically in a class like "price-dollars" or "product-price"
-        price_selectors = [
-            '[class*="price-dollar"]',
-            '[class*="product-price"]',
-            '[class*="current-price"]',
-            '.price',
-        ]
-        
-        for selector in price_selectors:
-            elem = await card.query_selector(selector)
-            if elem:
-                text = await elem.inner_text()
+        # This is typically in a class like "price-dollars" or "product-price" (see PRICE_SELECTORS)
+        for text in card['prices']:
+            if text is not None:
                 # Extract price from text like "$8.50" or "$8 50"
-                match = re.search(r'\$?(\d+)[\s.]?(\d{2})?', text)
+                match = _DOLLAR_CENTS_RE.search(text)
                 if match:
                     dollars = match.group(1)
                     cents = match.group(2) if match.group(2) else "00"
                     price = float(f"{dollars}.{cents}")
                     
                     # Filter out multi-buy prices (look for "for $" pattern nearby)
-                    parent_text = await card.inner_text()
-                    if f"for ${dollars}" not in parent_text:  # Not a multi-buy
+                    if f"for ${dollars}" not in full_text:  # Not a multi-buy
                         if 1 < price < 500:
                             return price
         
         # Strategy 3: Get all prices and filter intelligently
-        full_text = await card.inner_text()
-        
         # Find all prices
-        price_matches = re.findall(r'\$(\d+)\.(\d{2})', full_text)
+        price_matches = _ALL_PRICES_RE.findall(full_text)
         
         if price_matches:
+            # "X for $price" deals, collected in one pass rather than searched for per price
+            multi_buy = set(_MULTI_BUY_RE.findall(full_text))
             prices = []
             for match in price_matches:
                 price = float(f"{match[0]}.{match[1]}")
                 
                 # Skip if this is clearly a multi-buy deal
-                # Check if "X for $price" appears before this price
-                price_str = f"${match[0]}.{match[1]}"
-                if f"for {price_str}" in full_text:
+                if match in multi_buy:
                     continue  # Skip multi-buy prices
                 
                 # Skip unit prices (too high for a pack)
@@ -247,148 +290,179 @@ class WoolworthsScraper:
         
         return None
     
-    async def extract_original_price(self, card) -> float:
+    def extract_original_price(self, card: Dict, full_text: str) -> float:
         """Extract 'was' price if product is on sale"""
         
-        full_text = await card.inner_text()
-        
         # Look for "was $XX.XX" pattern
-        was_match = re.search(r'was\s+\$(\d+)\.(\d{2})', full_text, re.IGNORECASE)
+        was_match = _WAS_RE.search(full_text)
         if was_match:
             return float(f"{was_match.group(1)}.{was_match.group(2)}")
         
-        # Look for crossed-out price elements
-        strikethrough_selectors = [
-            '[class*="was"]',
-            '[class*="crossed"]',
-            '[class*="original"]',
-            'del',
-            's',
-        ]
-        
-        for selector in strikethrough_selectors:
-            elem = await card.query_selector(selector)
-            if elem:
-                text = await elem.inner_text()
-                match = re.search(r'\$?(\d+)\.(\d{2})', text)
+        # Look for crossed-out price elements (see WAS_SELECTORS)
+        for text in card['was']:
+            if text is not None:
+                match = _STRUCK_PRICE_RE.search(text)
                 if match:
                     return float(f"{match.group(1)}.{match.group(2)}")
         
         return None
     
-    async def extract_sku(self, card) -> str:
+    def extract_sku(self, card: Dict) -> str:
         """Extract SKU/product ID"""
         
-        for attr in ['data-stockcode', 'data-sku', 'data-product-id', 'stockcode']:
-            val = await card.get_attribute(attr)
+        for attr in SKU_ATTRIBUTES:
+            val = card['attrs'][attr]
             if val:
-                match = re.search(r'\d+', val)
+                match = _DIGITS_RE.search(val)
                 if match:
                     return match.group()
         
         # Try to extract from URL
-        href = await card.get_attribute('href')
-        if not href:
-            link = await card.query_selector('a')
-            if link:
-                href = await link.get_attribute('href')
+        href = card['attrs']['href'] or card['link_href']
         
         if href:
-            match = re.search(r'/product/(\d+)', href)
+            match = _PRODUCT_URL_RE.search(href)
             if match:
                 return match.group(1)
         
         return None
     
-    async def extract_brand(self, card, name: str) -> str:
+    def extract_brand(self, card: Dict, name: str) -> str:
         """Extract brand"""
         
-        brand_elem = await card.query_selector('[class*="brand"], [class*="Brand"]')
-        if brand_elem:
-            return await brand_elem.inner_text()
+        if card['brand'] is not None:
+            return card['brand']
         
         if name and 'woolworths' in name.lower():
             return 'Woolworths'
         
         return None
     
+    async def _ensure_browser(self):
+        """Launch Chromium and the Dunedin context on first use; later scrapes reuse them"""
+        
+        if self._context is not None:
+            return self._context
+        
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(
+            headless=self.headless,
+            args=[
+                '--disable-blink-features=AutomationControlled',
+                '--disable-dev-shm-usage',
+            ]
+        )
+        
+        self._context = await self._browser.new_context(
+            viewport={'width': 1920, 'height': 1080},
+            user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            locale='en-NZ',
+            timezone_id='Pacific/Auckland',
+            # FORCE DUNEDIN LOCATION!
+            geolocation={'latitude': -45.8788, 'longitude': 170.5028},  # Dunedin CBD
+            permissions=['geolocation'],
+        )
+        
+        await self._context.set_extra_http_headers({
+            'Accept-Language': 'en-NZ,en;q=0.9',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        })
+        
+        await self._context.add_init_script("""
+            Object.defineProperty(navigator, 'webdriver', {
+                get: () => undefined
+            });
+        """)
+        
+        return self._context
+    
+    async def aclose(self):
+        """Close the cached browser and stop Playwright"""
+        
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+        self._playwright = self._browser = self._context = None
+    
     async def scrape_all(self) -> List[Dict]:
         """Scrape all pages"""
         
         logger.info("🥩 Starting Woolworths scrape (FIXED VERSION V2)")
         
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(
-                headless=self.headless,
-                args=[
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-dev-shm-usage',
-                ]
-            )
-            
-            context = await browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                locale='en-NZ',
-                timezone_id='Pacific/Auckland',
-                # FORCE DUNEDIN LOCATION!
-                geolocation={'latitude': -45.8788, 'longitude': 170.5028},  # Dunedin CBD
-                permissions=['geolocation'],
-            )
+        context = await self._ensure_browser()
+        
+        # One shared context; each worker is a tab reused from page to page
+        idle = asyncio.Queue()
+        for _ in range(self.workers):
+            idle.put_nowait(await context.new_page())
+        
+        async def fetch(page_num):
+            page = await idle.get()
+            try:
+                return await self._fetch_page(page, page_num)
+            finally:
+                idle.put_nowait(page)
+        
+        max_pages = 100
+        pages_scraped = 0
+        tasks = [asyncio.create_task(fetch(page_num)) for page_num in range(1, max_pages + 1)]
+        
+        try:
+            # Consume in page order; a slow page doesn't hold up the other workers
+            for task in tasks:
+                page_products = await task
+                if not page_products:
+                    logger.info("No products extracted, stopping")
+                    break
+                
+                self.products.extend(page_products)
+                pages_scraped += 1
+        finally:
+            # Everything past the first empty page is empty too
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # Close only this run's tabs; the browser and context stay warm
+            while not idle.empty():
+                await idle.get_nowait().close()
+        
+        logger.info(f"✅ Scraped {len(self.products)} total products from {pages_scraped} pages")
+        return self.products
+    
+    async def _fetch_page(self, page, page_num: int) -> List[Dict]:
+        """Navigate a worker tab to one listing page and scrape it"""
+        
+        url = f"{self.base_url}?store=dunedin&page={page_num}&inStockProductsOnly=false"
+        logger.info(f"📄 Fetching page {page_num} from DUNEDIN...")
+        
+        try:
+            if page_num > 1:
+                delay = random.uniform(2, 4)
+                await asyncio.sleep(delay)
             
-            await context.set_extra_http_headers({
-                'Accept-Language': 'en-NZ,en;q=0.9',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            })
+            await page.goto(url, wait_until='commit', timeout=45000)
             
-            page = await context.new_page()
+            # Wait for the product grid instead of sleeping a fixed time
+            try:
+                await page.wait_for_selector(CARD_SELECTOR, timeout=15000)
+            except PlaywrightTimeoutError:
+                logger.warning(f"  No products found on page {page_num}")
+                return []
             
-            await page.add_init_script("""
-                Object.defineProperty(navigator, 'webdriver', {
-                    get: () => undefined
-                });
-            """)
+            # Scrolling only triggers lazy loading, so it doesn't need human-speed pauses
+            for _ in range(3):
+                await page.evaluate(f'window.scrollBy(0, {random.randint(300, 600)})')
+                await asyncio.sleep(random.uniform(0.1, 0.3))
             
-            page_num = 1
-            max_pages = 100
+            await page.mouse.move(random.randint(100, 800), random.randint(100, 600))
+            await asyncio.sleep(0.5)
             
-            while page_num <= max_pages:
-                url = f"{self.base_url}?store=dunedin&page={page_num}&inStockProductsOnly=false"
-                logger.info(f"📄 Fetching page {page_num} from DUNEDIN...")
-                
-                try:
-                    if page_num > 1:
-                        delay = random.uniform(2, 4)
-                        await asyncio.sleep(delay)
-                    
-                    await page.goto(url, wait_until='domcontentloaded', timeout=45000)
-                    await asyncio.sleep(4 if page_num == 1 else 6)
-                    
-                    # Human-like scrolling
-                    for _ in range(3):
-                        await page.evaluate(f'window.scrollBy(0, {random.randint(300, 600)})')
-                        await asyncio.sleep(random.uniform(0.5, 1.5))
-                    
-                    await page.mouse.move(random.randint(100, 800), random.randint(100, 600))
-                    await asyncio.sleep(0.5)
-                    
-                    page_products = await self.scrape_page(page, page_num)
-                    
-                    if not page_products:
-                        logger.info("No products extracted, stopping")
-                        break
-                    
-                    self.products.extend(page_products)
-                    page_num += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error on page {page_num}: {e}")
-                    break
+            return await self.scrape_page(page, page_num)
             
-            await browser.close()
-        
-        logger.info(f"✅ Scraped {len(self.products)} total products from {page_num-1} pages")
-        return self.products
+        except Exception as e:
+            logger.error(f"Error on page {page_num}: {e}")
+            return []
     
     def save_to_csv(self, filename: str = None):
         """Save products to CSV"""
@@ -397,11 +471,9 @@ class WoolworthsScraper:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = f'woolworths_specials_{timestamp}.csv'
         
-        df = pd.DataFrame(self.products)
-        
+        # Every product dict has the same keys, so build the frame straight from the records
         column_order = ['store', 'sku', 'name', 'brand', 'sale_price', 'original_price', 'saving', 'scraped_at']
-        column_order = [col for col in column_order if col in df.columns]
-        df = df[column_order]
+        df = pd.DataFrame.from_records(self.products, columns=column_order, coerce_float=True)
         
         df.to_csv(filename, index=False)
         logger.info(f"💾 Saved to {filename}")
@@ -432,8 +504,14 @@ def main():
     
     scraper = WoolworthsScraper(headless=args.headless)
     
+    async def run():
+        try:
+            return await scraper.scrape_all()
+        finally:
+            await scraper.aclose()
+    
     try:
-        products = asyncio.run(scraper.scrape_all())
+        products = asyncio.run(run())
         
         if products:
             filename = scraper.save_to_csv()
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the cleanup scripts
+"""
+
+import os
+
+def latest_matching(prefix: str, skip_cleaned: bool = True):
+    """Most recently modified '{prefix}*.csv' in the current directory (cleaned outputs skipped unless skip_cleaned=False)"""
+    best, best_mtime = None, -1.0
+    with os.scandir('.') as entries:
+        for entry in entries:
+            name = entry.name
+            if name.startswith(prefix) and name.endswith('.csv') and not (skip_cleaned and 'cleaned' in name):
+                mtime = entry.stat().st_mtime
+                if mtime > best_mtime:
+                    best, best_mtime = name, mtime
+    return best
@@ -6,9 +6,41 @@ Removes products with price < $5 and invalid products
 """
 
 import pandas as pd
+import numpy as np
 from datetime import datetime
 import sys
-import glob
+from cleanup_common import latest_matching
+
+# Known columns from the scraper, so read_csv doesn't have to infer them
+_MB_DTYPES = {
+    'store': str,
+    'name': str,
+    'brand': str,
+    'unit_type': str,
+    'sale_price': 'float64',
+    'original_price': 'float64',
+    'price_per_kg': 'float64',
+    'saving': 'float64',
+    'scraped_at': str,
+}
+
+def per_kg_text(per_kg) -> str:
+    return f" [${per_kg:.2f}/kg]" if pd.notna(per_kg) else ""
+
+def show_category(df, name_lc, keyword: str, emoji: str):
+    """Print the category total and its first 3 products (name_lc: df['name'] lowercased)"""
+    mask = name_lc.str.contains(keyword, regex=False, na=False)
+    total = int(mask.sum())
+    if total == 0:
+        return
+    
+    print(f"\n   {emoji} {keyword.upper()} ({total} total):")
+    sample = df[mask].head(3)
+    print("\n".join(
+        f"      {i}. {name[:45]:45s} ${price:6.2f} ({unit}){per_kg_text(per_kg)}"
+        for i, (name, price, unit, per_kg) in enumerate(
+            zip(sample['name'], sample['price'], sample['unit_type'], sample['price_per_kg']), 1)
+    ))
 
 def clean_madbutcher(input_file: str):
     """
@@ -26,7 +58,7 @@ def clean_madbutcher(input_file: str):
     
     # Load data
     print(f"\n📂 Loading: {input_file}")
-    df = pd.read_csv(input_file)
+    df = pd.read_csv(input_file, dtype=_MB_DTYPES)
     initial_count = len(df)
     
     print(f"\n📊 BEFORE CLEANUP:")
@@ -42,25 +74,31 @@ def clean_madbutcher(input_file: str):
     print(f"\n🔍 Checking for invalid products...")
     
     # Remove very short names (likely junk)
-    before = len(df)
-    df = df[df['name'].str.len() >= 10]
-    removed_short = before - len(df)
+    keep = df['name'].str.len() >= 10
+    removed_short = int((~keep).sum())
     if removed_short > 0:
         print(f"   ✂️  Removed {removed_short} products with names < 10 chars")
     
     # Remove common junk text
+    name_lc = df['name'].str.lower()  # Lowercased once; filtered along with df
     junk_patterns = ['specials', 'christmas', 'hours', 'closed', 'contact']
     for pattern in junk_patterns:
-        before = len(df)
-        df = df[~df['name'].str.lower().str.contains(pattern, na=False)]
-        removed = before - len(df)
+        junk = keep & name_lc.str.contains(pattern, regex=False, na=False)
+        keep &= ~junk
+        removed = int(junk.sum())
         if removed > 0:
             print(f"   ✂️  Removed {removed} products containing '{pattern}'")
     
+    # Short names and junk dropped in one go
+    df = df[keep]
+    name_lc = name_lc[keep]
+    
     # RULE 2: Remove cheap products (< $5)
     print(f"\n🔪 Removing products with price < $5...")
     before = len(df)
-    df = df[df['sale_price'] >= 0.5]
+    keep = df['sale_price'] >= 0.5
+    df = df[keep]
+    name_lc = name_lc[keep]
     removed_cheap = before - len(df)
     print(f"   ✂️  Removed: {removed_cheap} products")
     
@@ -69,24 +107,15 @@ def clean_madbutcher(input_file: str):
     
     # RULE 3: Add badge_type column
     print(f"\n🏷️  Adding badge_type column...")
-    def get_badge_type(row):
-        if row['saving'] > 0.5:  # At least 50 cents savings
-            return 'SALE'
-        return None
-    
-    df['badge_type'] = df.apply(get_badge_type, axis=1)
+    df['badge_type'] = np.where(df['saving'] > 0.5, 'SALE', None)  # At least 50 cents savings
     
     # RULE 4: Calculate percent_off
     print(f"\n💯 Calculating percent_off...")
-    def calc_percent_off(row):
-        if row['original_price'] > 0 and row['saving'] > 0:
-            return (row['saving'] / row['original_price']) * 100
-        return 0.0
-    
-    df['percent_off'] = df.apply(calc_percent_off, axis=1)
+    has_discount = (df['original_price'] > 0) & (df['saving'] > 0)
+    df['percent_off'] = np.where(has_discount, df['saving'] / df['original_price'] * 100, 0.0)
     
     # RULE 5: Rename sale_price to price for consistency with other stores
-    df = df.rename(columns={'sale_price': 'price'})
+    df.rename(columns={'sale_price': 'price'}, inplace=True)
     
     # Summary statistics
     print(f"\n📊 AFTER CLEANUP:")
@@ -107,57 +136,29 @@ def clean_madbutcher(input_file: str):
     best_deals = df[df['percent_off'] > 0].nlargest(10, 'percent_off')
     if len(best_deals) > 0:
         print(f"\n💰 TOP 10 BEST DEALS (Highest % Off):")
-        for i, row in enumerate(best_deals.itertuples(), 1):
-            per_kg_info = f" [${row.price_per_kg:.2f}/kg]" if pd.notna(row.price_per_kg) else ""
-            print(f"   {i:2d}. {row.name[:40]:40s} ${row.price:6.2f} (was ${row.original_price:.2f}) -{row.percent_off:4.1f}%{per_kg_info}")
+        print("\n".join(
+            f"   {i:2d}. {name[:40]:40s} ${price:6.2f} (was ${original:.2f}) -{pct:4.1f}%{per_kg_text(per_kg)}"
+            for i, (name, price, original, pct, per_kg) in enumerate(zip(
+                best_deals['name'], best_deals['price'], best_deals['original_price'],
+                best_deals['percent_off'], best_deals['price_per_kg']), 1)
+        ))
     
     # Show cheapest products
     print(f"\n💵 TOP 10 CHEAPEST PRODUCTS:")
     cheapest = df.nsmallest(10, 'price')
-    for i, row in enumerate(cheapest.itertuples(), 1):
-        unit_info = f" ({row.unit_type})"
-        per_kg_info = f" [${row.price_per_kg:.2f}/kg]" if pd.notna(row.price_per_kg) else ""
-        badge = f" [SALE -{row.percent_off:.0f}%]" if row.percent_off > 0 else ""
-        print(f"   {i:2d}. {row.name[:40]:40s} ${row.price:6.2f}{unit_info}{per_kg_info}{badge}")
+    print("\n".join(
+        f"   {i:2d}. {name[:40]:40s} ${price:6.2f} ({unit}){per_kg_text(per_kg)}"
+        + (f" [SALE -{pct:.0f}%]" if pct > 0 else "")
+        for i, (name, price, unit, per_kg, pct) in enumerate(zip(
+            cheapest['name'], cheapest['price'], cheapest['unit_type'],
+            cheapest['price_per_kg'], cheapest['percent_off']), 1)
+    ))
     
     # Sample products by category
     print(f"\n🥩 SAMPLE PRODUCTS BY CATEGORY:")
     
-    # Chicken
-    chicken = df[df['name'].str.contains('chicken', case=False, na=False)].head(3)
-    if len(chicken) > 0:
-        print(f"\n   🐔 CHICKEN ({len(df[df['name'].str.contains('chicken', case=False, na=False)])} total):")
-        for i, row in enumerate(chicken.itertuples(), 1):
-            unit = f" ({row.unit_type})"
-            per_kg = f" [${row.price_per_kg:.2f}/kg]" if pd.notna(row.price_per_kg) else ""
-            print(f"      {i}. {row.name[:45]:45s} ${row.price:6.2f}{unit}{per_kg}")
-    
-    # Beef
-    beef = df[df['name'].str.contains('beef', case=False, na=False)].head(3)
-    if len(beef) > 0:
-        print(f"\n   🥩 BEEF ({len(df[df['name'].str.contains('beef', case=False, na=False)])} total):")
-        for i, row in enumerate(beef.itertuples(), 1):
-            unit = f" ({row.unit_type})"
-            per_kg = f" [${row.price_per_kg:.2f}/kg]" if pd.notna(row.price_per_kg) else ""
-            print(f"      {i}. {row.name[:45]:45s} ${row.price:6.2f}{unit}{per_kg}")
-    
-    # Pork
-    pork = df[df['name'].str.contains('pork', case=False, na=False)].head(3)
-    if len(pork) > 0:
-        print(f"\n   🐷 PORK ({len(df[df['name'].str.contains('pork', case=False, na=False)])} total):")
-        for i, row in enumerate(pork.itertuples(), 1):
-            unit = f" ({row.unit_type})"
-            per_kg = f" [${row.price_per_kg:.2f}/kg]" if pd.notna(row.price_per_kg) else ""
-            print(f"      {i}. {row.name[:45]:45s} ${row.price:6.2f}{unit}{per_kg}")
-    
-    # Lamb
-    lamb = df[df['name'].str.contains('lamb', case=False, na=False)].head(3)
-    if len(lamb) > 0:
-        print(f"\n   🐑 LAMB ({len(df[df['name'].str.contains('lamb', case=False, na=False)])} total):")
-        for i, row in enumerate(lamb.itertuples(), 1):
-            unit = f" ({row.unit_type})"
-            per_kg = f" [${row.price_per_kg:.2f}/kg]" if pd.notna(row.price_per_kg) else ""
-            print(f"      {i}. {row.name[:45]:45s} ${row.price:6.2f}{unit}{per_kg}")
+    for keyword, emoji in [('chicken', '🐔'), ('beef', '🥩'), ('pork', '🐷'), ('lamb', '🐑')]:
+        show_category(df, name_lc, keyword, emoji)
     
     # Save cleaned data
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -175,18 +176,14 @@ if __name__ == '__main__':
         input_file = sys.argv[1]
     else:
         # Auto-detect latest Mad Butcher CSV file
-        files = glob.glob('madbutcher_products_*.csv')
-        files = [f for f in files if 'cleaned' not in f]
+        input_file = latest_matching('madbutcher_products_')
         
-        if not files:
+        if not input_file:
             print("❌ No Mad Butcher CSV file found!")
             print("Usage: python cleanup_madbutcher.py <input_file.csv>")
             print("   Or: Run scraper first to generate data")
             sys.exit(1)
         
-        # Use most recent file
-        files.sort(reverse=True)
-        input_file = files[0]
         print(f"🔍 Auto-detected: {input_file}")
     
     try:
@@ -6,9 +6,28 @@ Removes products with price < $5
 """
 
 import pandas as pd
+import numpy as np
 from datetime import datetime
 import sys
-import glob
+from cleanup_common import latest_matching
+
+# Known columns from the scraper, so read_csv doesn't have to infer them
+_NW_DTYPES = {
+    'store': str,
+    'name': str,
+    'brand': str,
+    'unit_type': str,
+    'sale_price': 'float64',
+    'original_price': 'float64',
+    'price_per_kg': 'float64',
+    'saving': 'float64',
+    'is_club_deal': 'bool',
+    'is_super_saver': 'bool',
+    'scraped_at': str,
+}
+
+# Summary stats printed before and after cleanup, computed in one df.agg call
+_NW_STATS = {'sale_price': ['min', 'max'], 'is_club_deal': 'sum', 'is_super_saver': 'sum'}
 
 def clean_newworld(input_file: str):
     """
@@ -24,20 +43,21 @@ def clean_newworld(input_file: str):
     
     # Load data
     print(f"\n📂 Loading: {input_file}")
-    df = pd.read_csv(input_file)
+    df = pd.read_csv(input_file, dtype=_NW_DTYPES)
     initial_count = len(df)
     
     # Check if this is V3 data (has price_per_kg column)
     is_v3 = 'price_per_kg' in df.columns
     print(f"   Data version: {'V3 (new)' if is_v3 else 'V2 (old)'}")
     
+    stats = df.agg(_NW_STATS)
     print(f"\n📊 BEFORE CLEANUP:")
     print(f"   Total products: {initial_count}")
-    print(f"   Price range: ${df['sale_price'].min():.2f} - ${df['sale_price'].max():.2f}")
+    print(f"   Price range: ${stats.loc['min', 'sale_price']:.2f} - ${stats.loc['max', 'sale_price']:.2f}")
     if is_v3:
         print(f"   Unit types: {df['unit_type'].value_counts().to_dict()}")
-    print(f"   Club Deals: {df['is_club_deal'].sum()}")
-    print(f"   Super Savers: {df['is_super_saver'].sum()}")
+    print(f"   Club Deals: {int(stats.loc['sum', 'is_club_deal'])}")
+    print(f"   Super Savers: {int(stats.loc['sum', 'is_super_saver'])}")
     
     # RULE 1: Remove cheap products (< $5)
     print(f"\n🔪 Removing products with sale_price < $5...")
@@ -48,39 +68,51 @@ def clean_newworld(input_file: str):
     
     # RULE 2: Recalculate savings and percentages for ALL products
     print(f"\n💰 Recalculating savings...")
-    df['saving'] = (df['original_price'] - df['sale_price']).round(2)
-    df['percent_off'] = ((df['original_price'] - df['sale_price']) / df['original_price'] * 100).round(1)
+    # Plain numpy arrays, updated in place (no intermediate Series per step)
+    original = df['original_price'].to_numpy(dtype=float)
+    saving = original - df['sale_price'].to_numpy(dtype=float)
+    percent_off = np.divide(saving, original, out=np.zeros_like(saving), where=original > 0)
+    percent_off *= 100
+    np.round(percent_off, 1, out=percent_off)
+    np.round(saving, 2, out=saving)
     
     # Fix any NaN or negative values
-    df['saving'] = df['saving'].fillna(0.0)
-    df['percent_off'] = df['percent_off'].fillna(0.0)
-    df.loc[df['saving'] < 0, 'saving'] = 0.0
-    df.loc[df['percent_off'] < 0, 'percent_off'] = 0.0
+    np.nan_to_num(saving, copy=False, nan=0.0)
+    saving[saving < 0] = 0.0
+    percent_off[percent_off < 0] = 0.0
+    df['saving'] = saving
+    df['percent_off'] = percent_off
     
     # Summary statistics
+    stats = df.agg(_NW_STATS)
+    discounted = df[df['saving'] > 0]
     print(f"\n📊 AFTER CLEANUP:")
     print(f"   Total products: {final_count}")
     print(f"   Total removed: {removed} ({((removed) / initial_count * 100):.1f}%)")
-    print(f"   Price range: ${df['sale_price'].min():.2f} - ${df['sale_price'].max():.2f}")
+    print(f"   Price range: ${stats.loc['min', 'sale_price']:.2f} - ${stats.loc['max', 'sale_price']:.2f}")
     if is_v3:
         print(f"   Unit types: {df['unit_type'].value_counts().to_dict()}")
         has_per_kg = df['price_per_kg'].notna().sum()
         print(f"   Products with per kg price: {has_per_kg}")
-    print(f"   Club Deals: {df['is_club_deal'].sum()}")
-    print(f"   Super Savers: {df['is_super_saver'].sum()}")
-    print(f"   Products with discount: {(df['saving'] > 0).sum()}")
-    if (df['saving'] > 0).sum() > 0:
-        print(f"   Average discount: ${df[df['saving'] > 0]['saving'].mean():.2f} ({df[df['saving'] > 0]['percent_off'].mean():.1f}% off)")
+    print(f"   Club Deals: {int(stats.loc['sum', 'is_club_deal'])}")
+    print(f"   Super Savers: {int(stats.loc['sum', 'is_super_saver'])}")
+    print(f"   Products with discount: {len(discounted)}")
+    if len(discounted) > 0:
+        means = discounted[['saving', 'percent_off']].mean()
+        print(f"   Average discount: ${means['saving']:.2f} ({means['percent_off']:.1f}% off)")
     
     # Show top 10 products with best discounts
-    discounted = df[df['saving'] > 0]
     if len(discounted) > 0:
         print(f"\n🏆 TOP 10 DEALS (by % off):")
         top_deals = discounted.nlargest(10, 'percent_off')
-        for i, row in enumerate(top_deals.itertuples(), 1):
-            badge = "CLUB" if row.is_club_deal else ("SUPER" if row.is_super_saver else "")
-            unit_info = f" ({row.unit_type})" if is_v3 else ""
-            print(f"   {i:2d}. {row.name[:35]:35s} ${row.sale_price:6.2f} (was ${row.original_price:.2f}) -{row.percent_off:4.1f}%{unit_info} [{badge}]")
+        units = top_deals['unit_type'] if is_v3 else [None] * len(top_deals)
+        print("\n".join(
+            f"   {i:2d}. {name[:35]:35s} ${price:6.2f} (was ${original:.2f}) -{pct:4.1f}%"
+            f"{f' ({unit})' if is_v3 else ''} [{'CLUB' if club else ('SUPER' if super_saver else '')}]"
+            for i, (name, price, original, pct, unit, club, super_saver) in enumerate(zip(
+                top_deals['name'], top_deals['sale_price'], top_deals['original_price'], top_deals['percent_off'],
+                units, top_deals['is_club_deal'], top_deals['is_super_saver']), 1)
+        ))
     else:
         print(f"\n⚠️  No products with discounts found - check if scraper is working correctly!")
     
@@ -100,18 +132,14 @@ if __name__ == '__main__':
         input_file = sys.argv[1]
     else:
         # Auto-detect latest New World CSV file
-        files = glob.glob('newworld_specials_*.csv')
-        files = [f for f in files if 'cleaned' not in f]
+        input_file = latest_matching('newworld_specials_')
         
-        if not files:
+        if not input_file:
             print("❌ No New World CSV file found!")
             print("Usage: python cleanup_newworld.py <input_file.csv>")
             print("   Or: Run scraper first to generate data")
             sys.exit(1)
         
-        # Use most recent file
-        files.sort(reverse=True)
-        input_file = files[0]
         print(f"📁 Auto-detected: {input_file}")
     
     try:
@@ -6,9 +6,44 @@ Removes products with price < $5
 """
 
 import pandas as pd
+import numpy as np
 from datetime import datetime
 import sys
-import glob
+from cleanup_common import latest_matching
+
+# Known columns from the scraper, so read_csv doesn't have to infer them
+_PS_DTYPES = {
+    'store': str,
+    'name': str,
+    'brand': str,
+    'unit_type': str,
+    'price': 'float64',
+    'price_per_kg': 'float64',
+    'promo_price': 'float64',
+    'is_everyday_low': 'bool',
+    'is_extra_low': 'bool',
+    'is_super_deal': 'bool',
+    'scraped_at': str,
+}
+
+# badge_type for every everyday/extra/super combination, indexed by the flags as bits
+_BADGE_LABELS = np.array([
+    None, 'SUPER', 'EXTRA', 'EXTRA, SUPER',
+    'EVERYDAY', 'EVERYDAY, SUPER', 'EVERYDAY, EXTRA', 'EVERYDAY, EXTRA, SUPER',
+], dtype=object)
+
+def badge_counts(combo):
+    """Everyday / extra / super / any-badge counts from the badge codes, in one bincount pass"""
+    per_code = np.bincount(combo, minlength=8)
+    return per_code[4:].sum(), per_code[[2, 3, 6, 7]].sum(), per_code[1::2].sum(), per_code[1:].sum()
+
+def sample_lines(rows, is_v3: bool) -> str:
+    """Numbered name/price(/unit) lines for a few sample products"""
+    units = rows['unit_type'] if is_v3 else [None] * len(rows)
+    return "\n".join(
+        f"      {i}. {name[:45]:45s} ${price:6.2f}{f' ({unit})' if is_v3 else ''}"
+        for i, (name, price, unit) in enumerate(zip(rows['name'], rows['price'], units), 1)
+    )
 
 def clean_paknsave(input_file: str):
     """
@@ -26,44 +61,45 @@ def clean_paknsave(input_file: str):
     
     # Load data
     print(f"\n📂 Loading: {input_file}")
-    df = pd.read_csv(input_file)
+    df = pd.read_csv(input_file, dtype=_PS_DTYPES, memory_map=True)
     initial_count = len(df)
     
     # Check if this is V3 data (has price_per_kg and unit_type columns)
     is_v3 = 'price_per_kg' in df.columns and 'unit_type' in df.columns
     print(f"   Data version: {'V3 (new)' if is_v3 else 'V2 (old)'}")
     
+    # Each row's three flags as one badge code (bits: everyday=4, extra=2, super=1)
+    combo = (df['is_everyday_low'].to_numpy(dtype=bool) * 4
+             + df['is_extra_low'].to_numpy(dtype=bool) * 2
+             + df['is_super_deal'].to_numpy(dtype=bool))
+    n_everyday, n_extra, n_super, n_badges = badge_counts(combo)
+    
     print(f"\n📊 BEFORE CLEANUP:")
     print(f"   Total products: {initial_count}")
     print(f"   Price range: ${df['price'].min():.2f} - ${df['price'].max():.2f}")
     if is_v3:
         print(f"   Unit types: {df['unit_type'].value_counts().to_dict()}")
-    print(f"   Everyday Low: {df['is_everyday_low'].sum()}")
-    print(f"   Extra Low: {df['is_extra_low'].sum()}")
-    print(f"   Super Deal: {df['is_super_deal'].sum()}")
-    total_badges = (df['is_everyday_low'] | df['is_extra_low'] | df['is_super_deal']).sum()
-    print(f"   Total with badges: {total_badges}")
+    print(f"   Everyday Low: {n_everyday}")
+    print(f"   Extra Low: {n_extra}")
+    print(f"   Super Deal: {n_super}")
+    print(f"   Total with badges: {n_badges}")
     
     # RULE 1: Remove cheap products (< $5)
     print(f"\n🔪 Removing products with price < $5...")
-    df = df[df['price'] >= 5.0]
+    keep = df['price'] >= 5.0
+    df = df[keep]
+    combo = combo[keep.to_numpy()]
+    n_everyday, n_extra, n_super, n_badges = badge_counts(combo)
     final_count = len(df)
     removed = initial_count - final_count
     print(f"   ✂️  Removed: {removed} products")
     
     # RULE 2: Add badge type column
     print(f"\n🏷️  Adding badge_type column...")
-    def get_badge_type(row):
-        badges = []
-        if row['is_everyday_low']:
-            badges.append('EVERYDAY')
-        if row['is_extra_low']:
-            badges.append('EXTRA')
-        if row['is_super_deal']:
-            badges.append('SUPER')
-        return ', '.join(badges) if badges else None  # ⚡ FIX: Return None instead of 'NONE'
-    
-    df['badge_type'] = df.apply(get_badge_type, axis=1)
+    # Each row's badge code picks one of the 8 precomputed labels (None when no badge)
+    df['badge_type'] = _BADGE_LABELS[combo]
+    has_badge = combo > 0
+    everyday_low, extra_low, super_deal = (combo & 4) > 0, (combo & 2) > 0, (combo & 1) > 0
     
     # RULE 3: Add percent_off column (always 0 for PAK'nSAVE)
     df['percent_off'] = 0.0
@@ -77,49 +113,47 @@ def clean_paknsave(input_file: str):
         print(f"   Unit types: {df['unit_type'].value_counts().to_dict()}")
         has_per_kg = df['price_per_kg'].notna().sum()
         print(f"   Products with per kg price: {has_per_kg}")
-    print(f"   Everyday Low: {df['is_everyday_low'].sum()}")
-    print(f"   Extra Low: {df['is_extra_low'].sum()}")
-    print(f"   Super Deal: {df['is_super_deal'].sum()}")
-    print(f"   Products with badges: {df['badge_type'].notna().sum()}")  # ⚡ FIX: Check for notna() instead of != 'NONE'
+    print(f"   Everyday Low: {n_everyday}")
+    print(f"   Extra Low: {n_extra}")
+    print(f"   Super Deal: {n_super}")
+    print(f"   Products with badges: {n_badges}")
     print(f"   Average price: ${df['price'].mean():.2f}")
     
     # Show top 10 cheapest products with badges (good deals!)
-    with_badges = df[df['badge_type'].notna()]  # ⚡ FIX: Use notna() instead of != 'NONE'
+    with_badges = df[has_badge]
     if len(with_badges) > 0:
         print(f"\n💰 TOP 10 CHEAPEST ITEMS WITH BADGES:")
         cheapest = with_badges.nsmallest(10, 'price')
-        for i, row in enumerate(cheapest.itertuples(), 1):
-            unit_info = f" ({row.unit_type})" if is_v3 else ""
-            per_kg_info = f" [${row.price_per_kg:.2f}/kg]" if is_v3 and pd.notna(row.price_per_kg) else ""
-            print(f"   {i:2d}. {row.name[:35]:35s} ${row.price:6.2f}{unit_info}{per_kg_info} [{row.badge_type}]")
-    
-    # Show sample products by badge type
+        units = cheapest['unit_type'] if is_v3 else [None] * len(cheapest)
+        per_kgs = cheapest['price_per_kg'] if is_v3 else [None] * len(cheapest)
+        print("\n".join(
+            f"   {i:2d}. {name[:35]:35s} ${price:6.2f}"
+            f"{f' ({unit})' if is_v3 else ''}{f' [${per_kg:.2f}/kg]' if is_v3 and pd.notna(per_kg) else ''} [{badge}]"
+            for i, (name, price, unit, per_kg, badge) in enumerate(
+                zip(cheapest['name'], cheapest['price'], units, per_kgs, cheapest['badge_type']), 1)
+        ))
+    
+    # Show sample products by badge type (only the first 3 rows of each mask are gathered)
     if final_count > 0:
         print(f"\n🏷️  SAMPLE PRODUCTS BY BADGE TYPE:")
         
         # Extra Low (most common)
-        extra = df[df['is_extra_low'] == True].head(3)
+        extra = df.iloc[np.flatnonzero(extra_low)[:3]]
         if len(extra) > 0:
-            print(f"\n   🔴 EXTRA LOW ({df['is_extra_low'].sum()} total):")
-            for i, row in enumerate(extra.itertuples(), 1):
-                unit_info = f" ({row.unit_type})" if is_v3 else ""
-                print(f"      {i}. {row.name[:45]:45s} ${row.price:6.2f}{unit_info}")
+            print(f"\n   🔴 EXTRA LOW ({n_extra} total):")
+            print(sample_lines(extra, is_v3))
         
         # Everyday Low
-        everyday = df[df['is_everyday_low'] == True].head(3)
+        everyday = df.iloc[np.flatnonzero(everyday_low)[:3]]
         if len(everyday) > 0:
-            print(f"\n   🟡 EVERYDAY LOW ({df['is_everyday_low'].sum()} total):")
-            for i, row in enumerate(everyday.itertuples(), 1):
-                unit_info = f" ({row.unit_type})" if is_v3 else ""
-                print(f"      {i}. {row.name[:45]:45s} ${row.price:6.2f}{unit_info}")
+            print(f"\n   🟡 EVERYDAY LOW ({n_everyday} total):")
+            print(sample_lines(everyday, is_v3))
         
         # Super Deal
-        super_deals = df[df['is_super_deal'] == True].head(3)
+        super_deals = df.iloc[np.flatnonzero(super_deal)[:3]]
         if len(super_deals) > 0:
-            print(f"\n   🟢 SUPER DEAL ({df['is_super_deal'].sum()} total):")
-            for i, row in enumerate(super_deals.itertuples(), 1):
-                unit_info = f" ({row.unit_type})" if is_v3 else ""
-                print(f"      {i}. {row.name[:45]:45s} ${row.price:6.2f}{unit_info}")
+            print(f"\n   🟢 SUPER DEAL ({n_super} total):")
+            print(sample_lines(super_deals, is_v3))
     
     # Save cleaned data
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -137,18 +171,14 @@ if __name__ == '__main__':
         input_file = sys.argv[1]
     else:
         # Auto-detect latest PAK'nSAVE CSV file
-        files = glob.glob('paknsave_deals_*.csv')
-        files = [f for f in files if 'cleaned' not in f]
+        input_file = latest_matching('paknsave_deals_')
         
-        if not files:
+        if not input_file:
             print("❌ No PAK'nSAVE CSV file found!")
             print("Usage: python cleanup_paknsave.py <input_file.csv>")
             print("   Or: Run scraper first to generate data")
             sys.exit(1)
         
-        # Use most recent file
-        files.sort(reverse=True)
-        input_file = files[0]
         print(f"📁 Auto-detected: {input_file}")
     
     try:
@@ -5,8 +5,23 @@ Removes products with price < $5 and products with no real discounts
 """
 
 import pandas as pd
+import numpy as np
 from datetime import datetime
 import sys
+from cleanup_common import latest_matching
+
+# Known columns from the scraper, so read_csv doesn't have to infer them
+_WW_DTYPES = {
+    'store': str,
+    'name': str,
+    'brand': str,
+    'sale_price': 'float64',
+    'original_price': 'float64',
+    'saving': 'float64',
+    'is_club_price': 'bool',
+    'is_on_special': 'bool',
+    'scraped_at': str,
+}
 
 def clean_woolworths(input_file: str):
     """
@@ -22,7 +37,7 @@ def clean_woolworths(input_file: str):
     
     # Load data
     print(f"\n📁 Loading: {input_file}")
-    df = pd.read_csv(input_file)
+    df = pd.read_csv(input_file, dtype=_WW_DTYPES)
     initial_count = len(df)
     
     # Add badge columns if they don't exist (older scraper versions)
@@ -47,8 +62,16 @@ def clean_woolworths(input_file: str):
     print(f"   ✂️  Removed: {removed} products")
     
     # Calculate savings and percentages for ALL products
-    df['saving'] = df['original_price'] - df['sale_price']
-    df['percent_off'] = ((df['original_price'] - df['sale_price']) / df['original_price'] * 100).round(1)
+    # Plain numpy arrays, updated in place (no intermediate Series per step)
+    original = df['original_price'].to_numpy(dtype=float)
+    saving = original - df['sale_price'].to_numpy(dtype=float)
+    # Rows without an original price keep NaN in both columns, like saving
+    percent_off = np.divide(saving, original, out=np.where(np.isnan(saving), np.nan, 0.0), where=original > 0)
+    percent_off *= 100
+    np.round(percent_off, 1, out=percent_off)
+    df['saving'] = saving
+    df['percent_off'] = percent_off
+    discounted = df[saving > 0]
     
     # Summary statistics
     print(f"\n📊 AFTER CLEANUP:")
@@ -57,19 +80,23 @@ def clean_woolworths(input_file: str):
     print(f"   Price range: ${df['sale_price'].min():.2f} - ${df['sale_price'].max():.2f}")
     print(f"   Club Prices: {df['is_club_price'].sum()}")
     print(f"   On Special: {df['is_on_special'].sum()}")
-    print(f"   Products with discount: {(df['saving'] > 0).sum()}")
+    print(f"   Products with discount: {len(discounted)}")
     print(f"   Average saving (all): ${df['saving'].mean():.2f} ({df['percent_off'].mean():.1f}% off)")
-    if (df['saving'] > 0).sum() > 0:
-        print(f"   Average saving (discounted only): ${df[df['saving'] > 0]['saving'].mean():.2f} ({df[df['saving'] > 0]['percent_off'].mean():.1f}% off)")
+    if len(discounted) > 0:
+        means = discounted[['saving', 'percent_off']].mean()
+        print(f"   Average saving (discounted only): ${means['saving']:.2f} ({means['percent_off']:.1f}% off)")
     
     # Show top 10 products with best discounts
-    discounted = df[df['saving'] > 0]
     if len(discounted) > 0:
         print(f"\n🏆 TOP 10 DEALS (by % off):")
         top_deals = discounted.nlargest(10, 'percent_off')[['name', 'sale_price', 'original_price', 'saving', 'percent_off', 'is_club_price', 'is_on_special']]
-        for i, row in enumerate(top_deals.itertuples(), 1):
-            badge = "CLUB" if row.is_club_price else ("SPECIAL" if row.is_on_special else "NONE")
-            print(f"   {i:2d}. {row.name[:40]:40s} ${row.sale_price:6.2f} (was ${row.original_price:.2f}) -{row.percent_off:4.1f}% [{badge}]")
+        print("\n".join(
+            f"   {i:2d}. {name[:40]:40s} ${price:6.2f} (was ${original:.2f}) -{pct:4.1f}%"
+            f" [{'CLUB' if club else ('SPECIAL' if special else 'NONE')}]"
+            for i, (name, price, original, pct, club, special) in enumerate(zip(
+                top_deals['name'], top_deals['sale_price'], top_deals['original_price'],
+                top_deals['percent_off'], top_deals['is_club_price'], top_deals['is_on_special']), 1)
+        ))
     else:
         print(f"\n⚠️  No products with discounts found")
     
@@ -87,17 +114,15 @@ if __name__ == '__main__':
     if len(sys.argv) > 1:
         input_file = sys.argv[1]
     else:
-        # Auto-detect Woolworths CSV file
-        import glob
-        files = glob.glob('woolworths_*.csv')
-        files = [f for f in files if 'cleaned' not in f]
+        # Auto-detect latest Woolworths CSV file
+        input_file = latest_matching('woolworths_')
         
-        if not files:
+        if not input_file:
             print("❌ No Woolworths CSV file found!")
             print("Usage: python cleanup_woolworths.py <input_file.csv>")
             sys.exit(1)
         
-        input_file = files[0]
+        print(f"📁 Auto-detected: {input_file}")
     
     try:
         clean_woolworths(input_file)
@@ -6,18 +6,36 @@ Scrapes all 4 stores, cleans data, creates master CSV, and uploads to GitHub
 
 import subprocess
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 import pandas as pd
 import numpy as np
 import json
 import os
+from cleanup_newworld_v3 import clean_newworld
+from cleanup_paknsave_v3 import clean_paknsave
+from cleanup_woolworths import clean_woolworths
+from cleanup_madbutcher import clean_madbutcher
+from cleanup_common import latest_matching
+
+try:
+    import orjson  # Faster JSON encoder for the API dump where available
+except ImportError:
+    orjson = None
+
+try:
+    import pyarrow  # Parquet copies of the master and API data; CSV-only without it
+except ImportError:
+    pyarrow = None
+
+# Scripts run in parallel; each one's report is printed as a single block
+_print_lock = threading.Lock()
 
 def run_script(script_name):
     """Run a Python script and return success status"""
-    print(f"\n{'='*70}")
-    print(f"▶️  Running: {script_name}")
-    print('='*70)
+    report = [f"\n{'='*70}", f"▶️  Running: {script_name}", '='*70]
     
     try:
         result = subprocess.run(
@@ -26,35 +44,62 @@ def run_script(script_name):
             text=True,
             check=True
         )
-        print(result.stdout)
+        report.append(result.stdout)
         if result.stderr:
-            print("Warnings:", result.stderr)
-        print(f"\n✅ {script_name} completed successfully")
-        return True
+            report.append(f"Warnings: {result.stderr}")
+        report.append(f"\n✅ {script_name} completed successfully")
+        success = True
     except subprocess.CalledProcessError as e:
-        print(f"❌ Error running {script_name}:")
-        print(e.stderr)
-        return False
+        report.append(f"❌ Error running {script_name}:")
+        report.append(e.stderr)
+        success = False
+    
+    with _print_lock:
+        print("\n".join(report))
+    return success
+
+def run_scripts(scripts):
+    """Run independent scripts concurrently and return the ones that failed"""
+    with ThreadPoolExecutor(max_workers=len(scripts)) as pool:
+        results = list(pool.map(run_script, scripts))
+    return [script for script, ok in zip(scripts, results) if not ok]
+
+# Columns combine_csvs reads from each store's cleaned CSV (optional ones may be missing)
+NW_COLUMNS = {'name', 'brand', 'sale_price', 'original_price', 'price_per_kg', 'unit_type',
+              'saving', 'percent_off', 'is_club_deal', 'is_super_saver', 'scraped_at'}
+PS_COLUMNS = {'name', 'brand', 'price', 'promo_price', 'price_per_kg', 'unit_type',
+              'saving', 'percent_off', 'badge_type', 'scraped_at'}
+WW_COLUMNS = {'name', 'brand', 'sale_price', 'original_price',
+              'saving', 'percent_off', 'is_club_price', 'is_on_special', 'scraped_at'}
+MB_COLUMNS = {'name', 'brand', 'price', 'original_price', 'price_per_kg', 'unit_type',
+              'saving', 'percent_off', 'badge_type', 'scraped_at'}
 
-def combine_csvs():
-    """Combine all cleaned CSVs into one master file"""
+def flag(df, column):
+    """Boolean array for a deal flag column (all False if the column is missing)"""
+    if column not in df.columns:
+        return np.zeros(len(df), dtype=bool)
+    return df[column].to_numpy(dtype=bool)
+
+def combine_csvs(cleaned=None):
+    """Combine all cleaned CSVs into one master file (cleaned: store -> frame from the cleaners, if already in memory)"""
     print(f"\n{'='*70}")
     print("🔗 COMBINING ALL 4 STORES INTO ONE CSV")
     print('='*70)
     
-    # Find the latest cleaned files
-    files = {
-        'newworld': sorted(Path('.').glob('newworld_cleaned_*.csv'))[-1],
-        'paknsave': sorted(Path('.').glob('paknsave_cleaned_*.csv'))[-1],
-        'woolworths': sorted(Path('.').glob('woolworths_cleaned_*.csv'))[-1],
-        'madbutcher': sorted(Path('.').glob('madbutcher_cleaned_*.csv'))[-1]
-    }
+    # Without the cleaners' frames, load the latest cleaned files
+    if cleaned is None:
+        cleaned = {
+            'newworld': pd.read_csv(latest_matching('newworld_cleaned_', skip_cleaned=False), usecols=lambda c: c in NW_COLUMNS),
+            'paknsave': pd.read_csv(latest_matching('paknsave_cleaned_', skip_cleaned=False), usecols=lambda c: c in PS_COLUMNS),
+            'woolworths': pd.read_csv(latest_matching('woolworths_cleaned_', skip_cleaned=False), usecols=lambda c: c in WW_COLUMNS),
+            'madbutcher': pd.read_csv(latest_matching('madbutcher_cleaned_', skip_cleaned=False), usecols=lambda c: c in MB_COLUMNS),
+        }
     
     dfs = []
     
     # Load New World
     print(f"\n📂 Loading New World data...")
-    nw = pd.read_csv(files['newworld'])
+    nw = cleaned['newworld']
     nw_clean = pd.DataFrame({
         'store': 'New World',
         'name': nw['name'],
@@ -65,7 +110,7 @@ def combine_csvs():
         'unit_type': nw['unit_type'],
         'saving': nw['saving'],
         'percent_off': nw['percent_off'],
-        'deal_type': nw.apply(lambda x: 'Club Deal' if x.get('is_club_deal') else ('Super Saver' if x.get('is_super_saver') else None), axis=1),
+        'deal_type': np.select([flag(nw, 'is_club_deal'), flag(nw, 'is_super_saver')], ['Club Deal', 'Super Saver'], default=None),
         'scraped_at': nw['scraped_at']
     })
     dfs.append(nw_clean)
@@ -73,7 +118,7 @@ def combine_csvs():
     
     # Load PAK'nSAVE
     print(f"📂 Loading PAK'nSAVE data...")
-    ps = pd.read_csv(files['paknsave'])
+    ps = cleaned['paknsave']
     ps_clean = pd.DataFrame({
         'store': "PAK'nSAVE",
         'name': ps['name'],
@@ -92,18 +137,18 @@ def combine_csvs():
     
     # Load Woolworths
     print(f"📂 Loading Woolworths data...")
-    ww = pd.read_csv(files['woolworths'])
+    ww = cleaned['woolworths']
     ww_clean = pd.DataFrame({
         'store': 'Woolworths',
         'name': ww['name'],
         'brand': ww['brand'],
         'price': ww['sale_price'],
         'original_price': ww['original_price'],
-        'price_per_kg': None,
+        'price_per_kg': np.nan,
         'unit_type': 'ea',
         'saving': ww['saving'],
         'percent_off': ww['percent_off'],
-        'deal_type': ww.apply(lambda x: 'Club Price' if x.get('is_club_price') else ('On Special' if x.get('is_on_special') else None), axis=1),
+        'deal_type': np.select([flag(ww, 'is_club_price'), flag(ww, 'is_on_special')], ['Club Price', 'On Special'], default=None),
         'scraped_at': ww['scraped_at']
     })
     dfs.append(ww_clean)
@@ -111,7 +156,7 @@ def combine_csvs():
     
     # Load Mad Butcher
     print(f"📂 Loading Mad Butcher data...")
-    mb = pd.read_csv(files['madbutcher'])
+    mb = cleaned['madbutcher']
     mb_clean = pd.DataFrame({
         'store': 'Mad Butcher',
         'name': mb['name'],
@@ -135,28 +180,26 @@ def combine_csvs():
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     output_file = f'churbro_master_{timestamp}.csv'
     
-    # Save
+    # Save (the Parquet copy lets create_api_files skip re-parsing the CSV)
     combined.to_csv(output_file, index=False)
+    if pyarrow is not None:
+        combined.to_parquet(Path(output_file).with_suffix('.parquet'), engine='pyarrow', compression='zstd', index=False)
     
     # Stats
     print(f"\n📊 COMBINED STATS:")
     print(f"   Total products: {len(combined)}")
-    nw_count = len(combined[combined['store'] == 'New World'])
-    ps_count = len(combined[combined['store'] == "PAK'nSAVE"])
-    ww_count = len(combined[combined['store'] == 'Woolworths'])
-    mb_count = len(combined[combined['store'] == 'Mad Butcher'])
-    print(f"   New World:   {nw_count:4d}")
-    print(f"   PAK'nSAVE:   {ps_count:4d}")
-    print(f"   Woolworths:  {ww_count:4d}")
-    print(f"   Mad Butcher: {mb_count:4d}")
+    print(f"   New World:   {len(nw_clean):4d}")
+    print(f"   PAK'nSAVE:   {len(ps_clean):4d}")
+    print(f"   Woolworths:  {len(ww_clean):4d}")
+    print(f"   Mad Butcher: {len(mb_clean):4d}")
     print(f"   Price range: ${combined['price'].min():.2f} - ${combined['price'].max():.2f}")
     print(f"   Products with deals: {combined['deal_type'].notna().sum()}")
     print(f"   Products with discounts: {(combined['saving'] > 0).sum()}")
     
-    print(f"\n✅ SAVED MASTER CSV: {output_file}")
+    print(f"\n✅ SAVED MASTER CSV: {output_file}{' (+ .parquet)' if pyarrow is not None else ''}")
     print(f"   Columns: {', '.join(combined.columns)}")
     
-    return output_file
+    return output_file, combined
 
 def organize_files(master_csv):
     """Move all files into a dated folder"""
@@ -177,6 +220,7 @@ def organize_files(master_csv):
     # Move files
     files_to_move = [
         master_csv_path,
+        master_csv_path.with_suffix('.parquet'),
         *Path('.').glob('paknsave_cleaned_*.csv'),
         *Path('.').glob('woolworths_cleaned_*.csv'),
         *Path('.').glob('newworld_cleaned_*.csv'),
@@ -191,7 +235,7 @@ def organize_files(master_csv):
     for file in files_to_move:
         if file.exists() and file.parent == Path('.'):
             target = folder / file.name
-            file.rename(target)
+            os.replace(file, target)
             marker = " ⭐ (MASTER FILE)" if file.name == master_csv else ""
             print(f"  ✓ Moved: {file.name}{marker}")
             moved_count += 1
@@ -203,37 +247,47 @@ def organize_files(master_csv):
     
     return folder / master_csv
 
-def create_api_files(master_csv):
-    """Create JSON and CSV files for the web app API"""
+def create_api_files(master_csv, df=None):
+    """Create JSON and CSV files for the web app API (df: the combined frame, if already in memory)"""
     print(f"\n{'='*70}")
     print("📦 CREATING API FILES FOR WEB APP")
     print('='*70)
     
-    # Load master CSV
-    df = pd.read_csv(master_csv)
-    
-    # Replace NaN with None (becomes null in JSON)
-    df = df.replace({np.nan: None})
+    # Load master data only when not handed over, from the Parquet copy when combine_csvs wrote one
+    if df is None:
+        master_parquet = Path(master_csv).with_suffix('.parquet')
+        df = pd.read_parquet(master_parquet) if pyarrow is not None and master_parquet.exists() else pd.read_csv(master_csv)
     
     # Create API directory
     api_dir = Path('api')
     api_dir.mkdir(exist_ok=True)
     
+    # Save as Parquet (typed and compressed, for consumers that don't need JSON)
+    parquet_file = api_dir / 'latest.parquet'
+    if pyarrow is not None:
+        df.to_parquet(parquet_file, engine='pyarrow', compression='zstd', index=False)
+    
+    # Replace NaN with None (becomes null in JSON)
+    df = df.replace({np.nan: None})
+    
     # Prepare data
     api_data = {
         'updated_at': datetime.now().isoformat(),
         'total_products': len(df),
         'stores': {
-            store: len(df[df['store'] == store])
-            for store in df['store'].unique()
+            store: int(count)
+            for store, count in df.groupby('store', sort=False).size().items()
         },
         'products': df.to_dict('records')
     }
     
-    # Save as JSON
+    # Save as compact JSON (the web app only parses it; indentation just inflated the download)
     json_file = api_dir / 'latest.json'
-    with open(json_file, 'w', encoding='utf-8') as f:
-        json.dump(api_data, f, indent=2)
+    if orjson is not None:
+        json_file.write_bytes(orjson.dumps(api_data, option=orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump(api_data, f, separators=(',', ':'))
     
     # Save as CSV (same as master)
     csv_file = api_dir / 'latest.csv'
@@ -258,6 +312,8 @@ def create_api_files(master_csv):
     print(f"   📊 {len(df)} products from 4 stores")
     print(f"   📏 File size: {json_file.stat().st_size / 1024:.1f} KB")
     print(f"✅ Created: {csv_file}")
+    if pyarrow is not None:
+        print(f"✅ Created: {parquet_file}")
     print(f"✅ Created: {metadata_file}")
     print(f"\n🌐 Web app will use: {json_file}")
 
@@ -315,32 +371,42 @@ def main():
         'automated_scraper_MB.py'
     ]
     
-    for scraper in scrapers:
-        if not run_script(scraper):
-            print(f"\n❌ Failed at scraping phase: {scraper}")
-            sys.exit(1)
+    # The stores are independent, so scrape them all at once
+    failed = run_scripts(scrapers)
+    if failed:
+        print(f"\n❌ Failed at scraping phase: {', '.join(failed)}")
+        sys.exit(1)
     
     # PHASE 2: Cleaning
     print("\n\n🧹 PHASE 2: CLEANING DATA")
     print("="*70)
     
+    # Cleaners run in-process (no interpreter + pandas start-up each), and their
+    # frames go straight to combine_csvs instead of being re-read from CSV
     cleaners = [
-        'cleanup_newworld_v3.py',
-        'cleanup_paknsave_v3.py',
-        'cleanup_woolworths.py',  # No _v3 suffix!
-        'cleanup_madbutcher.py'
+        ('newworld', clean_newworld, 'newworld_specials_'),
+        ('paknsave', clean_paknsave, 'paknsave_deals_'),
+        ('woolworths', clean_woolworths, 'woolworths_specials_'),
+        ('madbutcher', clean_madbutcher, 'madbutcher_products_'),
     ]
     
-    for cleaner in cleaners:
-        if not run_script(cleaner):
-            print(f"\n❌ Failed at cleaning phase: {cleaner}")
+    cleaned = {}
+    for store, clean, prefix in cleaners:
+        input_file = latest_matching(prefix)
+        if not input_file:
+            print(f"\n❌ Failed at cleaning phase: no {prefix}*.csv found")
+            sys.exit(1)
+        try:
+            cleaned[store], _ = clean(input_file)
+        except Exception as e:
+            print(f"\n❌ Failed at cleaning phase: {clean.__name__}: {e}")
             sys.exit(1)
     
     # PHASE 3: Combining
     print("\n\n🔗 PHASE 3: COMBINING DATA")
     print("="*70)
     
-    master_csv = combine_csvs()
+    master_csv, combined = combine_csvs(cleaned)
     
     # PHASE 4: Organizing
     master_csv_path = organize_files(master_csv)
@@ -356,7 +422,7 @@ def main():
     # PHASE 5: Create API files
     print("\n\n📦 PHASE 5: CREATING WEB APP API")
     print("="*70)
-    create_api_files(master_csv_path)
+    create_api_files(master_csv_path, df=combined)
     
     # PHASE 6: Upload to GitHub
     print("\n\n🚀 PHASE 6: UPLOADING TO GITHUB")
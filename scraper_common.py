@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the Playwright scrapers
+"""
+
+from urllib.parse import urlsplit
+
+# Nothing the scrapers read needs these (they take text and attributes, not downloads).
+# Stylesheets stay: innerText depends on CSS visibility.
+BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font'}
+# Tracker hosts, matched on the hostname (and its subdomains) so first-party
+# URLs that merely contain a word like "segment" still load
+BLOCKED_HOSTS = (
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'facebook.net',
+    'facebook.com',
+    'hotjar.com',
+    'hotjar.io',
+    'cdn.segment.com',
+    'api.segment.io',
+)
+
+def is_blocked_host(url: str) -> bool:
+    """True if url points at one of BLOCKED_HOSTS or a subdomain of one"""
+    host = urlsplit(url).hostname or ''
+    return any(host == blocked or host.endswith('.' + blocked) for blocked in BLOCKED_HOSTS)
+
+async def block_unneeded_requests(route):
+    """Playwright route handler: abort heavy assets and trackers, let the rest through"""
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or is_blocked_host(request.url):
+        await route.abort()
+    else:
+        await route.continue_()